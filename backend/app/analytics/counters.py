@@ -0,0 +1,117 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Optional
+from bson import ObjectId
+from pymongo import UpdateOne, UpdateMany
+from app.core.config import settings
+from app.db.leases import acquire_lease
+
+# Dashboard counters, kept as sharded documents in the `counters` collection:
+#   {"_id": "<scope>:<shard>", "scope": "<scope>", "pending_misconceptions": n, ...}
+# Scopes are "global", "institution:<id>" and "professor:<id>". Writers $inc one
+# random shard per scope so hot scopes don't serialize on a single document;
+# readers sum the shards of one scope. reconcile_counters recomputes them from source.
+
+COUNTER_FIELDS = ["pending_misconceptions", "valid_misconceptions", "rejected_misconceptions", "processed_responses"]
+
+def counter_scopes(professor_id: Optional[str], institution_id: Optional[str]) -> list:
+    scopes = ["global"]
+    if institution_id:
+        scopes.append(f"institution:{institution_id}")
+    if professor_id:
+        scopes.append(f"professor:{professor_id}")
+    return scopes
+
+def status_field(status: str) -> Optional[str]:
+    field = f"{status}_misconceptions"
+    return field if field in COUNTER_FIELDS else None
+
+INSTITUTION_CACHE_SECONDS = 300 # a professor who changes institution is counted there after this long
+_institutions = {} # professor_id -> (institution_id, expires_at)
+
+async def get_institution_id(db, professor_id: Optional[str]) -> Optional[str]:
+    if not professor_id or not ObjectId.is_valid(str(professor_id)):
+        return None
+    cached = _institutions.get(professor_id)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    user = await db.users.find_one({"_id": ObjectId(str(professor_id))}, {"institution_id": 1})
+    institution_id = user.get("institution_id") if user else None
+    _institutions[professor_id] = (institution_id, time.monotonic() + INSTITUTION_CACHE_SECONDS)
+    return institution_id
+
+async def increment_counters(db, professor_id: Optional[str], institution_id: Optional[str], deltas: dict):
+    deltas = {k: v for k, v in deltas.items() if k and v}
+    if not deltas:
+        return
+    shard = random.randrange(settings.COUNTER_SHARDS)
+    # One round trip for all scopes
+    await db.counters.bulk_write([
+        UpdateOne({"_id": f"{scope}:{shard}"}, {"$inc": deltas, "$set": {"scope": scope}}, upsert=True)
+        for scope in counter_scopes(professor_id, institution_id)
+    ], ordered=False)
+
+async def record_status_change(db, before: dict, new_status: str):
+    # `before` is the pre-update misconception (status, professor_id, institution_id)
+    old_status = before.get("status")
+    if old_status == new_status:
+        return
+    deltas = {}
+    if status_field(old_status):
+        deltas[status_field(old_status)] = -1
+    if status_field(new_status):
+        deltas[status_field(new_status)] = 1
+    await increment_counters(db, before.get("professor_id"), before.get("institution_id"), deltas)
+
+async def read_counters(db, scope: str) -> dict:
+    group = {"_id": None, **{f: {"$sum": f"${f}"} for f in COUNTER_FIELDS}}
+    docs = await db.counters.aggregate([{"$match": {"scope": scope}}, {"$group": group}]).to_list(1)
+    totals = docs[0] if docs else {}
+    return {f: totals.get(f, 0) for f in COUNTER_FIELDS}
+
+async def reconcile_counters(db) -> int:
+    # Recompute every scope from misconceptions and submissions, then rewrite the shards
+    totals = defaultdict(lambda: {f: 0 for f in COUNTER_FIELDS})
+
+    pipeline = [{"$group": {
+        "_id": {"professor_id": "$professor_id", "institution_id": "$institution_id", "status": "$status"},
+        "count": {"$sum": 1}
+    }}]
+    async for doc in db.misconceptions.aggregate(pipeline):
+        field = status_field(doc["_id"].get("status"))
+        if not field:
+            continue
+        for scope in counter_scopes(doc["_id"].get("professor_id"), doc["_id"].get("institution_id")):
+            totals[scope][field] += doc["count"]
+
+    pipeline = [{"$group": {"_id": "$professor_id", "responses": {"$sum": "$response_count"}}}]
+    async for doc in db.submissions.aggregate(pipeline):
+        institution_id = await get_institution_id(db, doc["_id"])
+        for scope in counter_scopes(doc["_id"], institution_id):
+            totals[scope]["processed_responses"] += doc["responses"]
+
+    # Shard 0 carries the reconciled total; the other shards (and vanished scopes) drop to zero
+    zeros = {f: 0 for f in COUNTER_FIELDS}
+    ops = [UpdateMany({"scope": {"$nin": list(totals)}}, {"$set": zeros})]
+    for scope, values in totals.items():
+        ops.append(UpdateMany({"scope": scope, "_id": {"$ne": f"{scope}:0"}}, {"$set": zeros}))
+        ops.append(UpdateOne({"_id": f"{scope}:0"}, {"$set": {"scope": scope, **values}}, upsert=True))
+    await db.counters.bulk_write(ops, ordered=True)
+    return len(totals)
+
+async def run_reconciliation(get_db):
+    # Background job started with the app in every worker: reconciles right away (counters are
+    # empty on first deploy) and then every interval, with a Mongo lease so only one worker
+    # rewrites the shards per interval.
+    interval = settings.COUNTER_RECONCILE_INTERVAL_SECONDS
+    while True:
+        try:
+            db = await get_db()
+            if await acquire_lease(db, "counters.reconcile", interval):
+                scopes = await reconcile_counters(db)
+                print(f"[Counters] Reconciled {scopes} scopes")
+        except Exception as e:
+            print(f"[Counters] Reconciliation failed: {e}")
+        await asyncio.sleep(interval)
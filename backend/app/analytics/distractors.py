@@ -0,0 +1,107 @@
+from typing import List, Optional
+from app.analytics.exam_stats import field_key, option_key
+from app.db.fanout import fan_out
+
+# Distractor analysis for MCQ questions.
+# Overall option counts come from the exam_stats tallies maintained at ingest. The
+# top-vs-bottom-quartile split needs to know who picked what, so it is one $group over
+# the quartile students' responses; callers cache the result per exam data version.
+
+LOW_SELECTION_RATE = 0.05 # wrong options picked by fewer than 5% do no work as distractors
+
+async def score_quartiles(db, exam_id: str):
+    """(top, bottom) student ids by submission score; empty with fewer than 4 attempts."""
+    submissions = await db.submissions.find(
+        {"assessment_id": exam_id}, {"_id": 0, "student_id": 1, "score": 1}
+    ).sort("score", 1).to_list(None)
+    size = len(submissions) // 4
+    if size == 0:
+        return [], []
+    ids = [s["student_id"] for s in submissions]
+    return ids[-size:], ids[:size]
+
+async def quartile_option_counts(db, exam_id: str, top: List[str], bottom: List[str]) -> dict:
+    # {(question_id, response_text, is_top): n} for the two quartile groups
+    pipeline = [
+        {"$match": {"assessment_id": exam_id, "student_id": {"$in": top + bottom}}},
+        {"$group": {
+            "_id": {
+                "question_id": "$question_id",
+                "response_text": "$response_text",
+                "top": {"$in": ["$student_id", top]}
+            },
+            "count": {"$sum": 1}
+        }}
+    ]
+    counts = {}
+    async for doc in db.student_responses.aggregate(pipeline):
+        key = doc["_id"]
+        counts[(key["question_id"], key.get("response_text"), key["top"])] = doc["count"]
+    return counts
+
+def _rate(count: int, total: int) -> Optional[float]:
+    return round(count / total, 4) if total else None
+
+async def build_distractor_report(db, exam: dict) -> dict:
+    exam_id = str(exam["_id"])
+    questions = [q for q in exam.get("questions", []) if q.get("options")]
+
+    reads = await fan_out(
+        "analytics.distractors",
+        stats=lambda: db.exam_stats.find_one({"_id": exam_id}, {"questions": 1, "attempt_count": 1}),
+        quartiles=lambda: score_quartiles(db, exam_id),
+    )
+    stats = reads["stats"] or {}
+    top, bottom = reads["quartiles"]
+    raw = await quartile_option_counts(db, exam_id, top, bottom) if top else {}
+
+    # Map raw answer text onto option keys ("0".."n", "blank", "other")
+    by_question = {q["id"]: q for q in questions}
+    quartile = {} # (question_id, option key, is_top) -> n
+    for (question_id, text, is_top), n in raw.items():
+        question = by_question.get(question_id)
+        if question:
+            key = (question_id, option_key(question, text), is_top)
+            quartile[key] = quartile.get(key, 0) + n
+
+    report = []
+    for q in questions:
+        tallies = stats.get("questions", {}).get(field_key(q["id"]), {}).get("options", {})
+        answered = sum(tallies.values())
+        correct_key = option_key(q, q.get("correct_answer", ""))
+
+        options = []
+        keys = [str(i) for i in range(len(q["options"]))] + ["blank", "other"]
+        for key in keys:
+            count = tallies.get(key, 0)
+            if key in ("blank", "other") and not count:
+                continue
+            top_rate = _rate(quartile.get((q["id"], key, True), 0), len(top))
+            bottom_rate = _rate(quartile.get((q["id"], key, False), 0), len(bottom))
+            is_correct = key == correct_key
+            rate = _rate(count, answered)
+            options.append({
+                "option": key,
+                "text": q["options"][int(key)] if key.isdigit() else None,
+                "is_correct": is_correct,
+                "count": count,
+                "rate": rate,
+                "top_quartile_rate": top_rate,
+                "bottom_quartile_rate": bottom_rate,
+                # Positive for a working distractor (weaker students pick it more)
+                "discrimination": round(bottom_rate - top_rate, 4) if top_rate is not None and not is_correct else None,
+                "low_selection": bool(not is_correct and key.isdigit() and answered and rate < LOW_SELECTION_RATE),
+            })
+        report.append({
+            "question_id": q["id"],
+            "text": q.get("text", ""),
+            "answered": answered,
+            "options": options,
+        })
+
+    return {
+        "assessment_id": exam_id,
+        "attempts": stats.get("attempt_count", 0),
+        "quartile_size": len(top),
+        "questions": report,
+    }
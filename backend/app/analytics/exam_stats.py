@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from bson import ObjectId
+
+# exam_stats holds one counter document per exam, keyed by the assessment id:
+# {
+#   "_id": assessment_id, "professor_id": ...,
+#   "attempt_count", "response_count", "correct_count", "score_total",
+#   "score_histogram": {"0".."9": n},   # score as a percentage of total marks, in deciles
+#   "questions": {qid: {"correct", "incorrect", "options": {"0".."n", "blank", "other": n}}}
+# }
+# Ingest only ever $inc's these counters; rebuild_exam_stats recomputes them from raw data.
+
+HISTOGRAM_BUCKETS = 10
+
+def field_key(value: str) -> str:
+    # Mongo field names cannot contain '.' or start with '$'
+    return str(value).replace(".", "_").replace("$", "_")
+
+def score_bucket(score: float, total_marks: float) -> str:
+    if not total_marks:
+        return "0"
+    bucket = int((score / total_marks) * HISTOGRAM_BUCKETS)
+    return str(min(max(bucket, 0), HISTOGRAM_BUCKETS - 1))
+
+def option_key(question: Optional[dict], response_text: str) -> str:
+    text = (response_text or "").strip().lower()
+    if not text:
+        return "blank"
+    if question:
+        for i, opt in enumerate(question.get("options", [])):
+            if str(opt).strip().lower() == text:
+                return str(i)
+    return "other"
+
+def submission_increments(exam: Optional[dict], submission: dict, response_dicts: List[dict]) -> dict:
+    questions = {q["id"]: q for q in (exam or {}).get("questions", [])}
+
+    inc = {
+        "attempt_count": 1,
+        "response_count": submission["response_count"],
+        "correct_count": submission["correct_count"],
+        "score_total": submission["score"],
+        f"score_histogram.{score_bucket(submission['score'], submission['total_marks'])}": 1,
+    }
+    for r in response_dicts:
+        qkey = field_key(r["question_id"])
+        outcome = "correct" if r["is_correct"] else "incorrect"
+        option = option_key(questions.get(r["question_id"]), r["response_text"])
+        inc[f"questions.{qkey}.{outcome}"] = inc.get(f"questions.{qkey}.{outcome}", 0) + 1
+        inc[f"questions.{qkey}.options.{option}"] = inc.get(f"questions.{qkey}.options.{option}", 0) + 1
+    return inc
+
+async def record_submission(db, exam: Optional[dict], submission: dict, response_dicts: List[dict]):
+    await db.exam_stats.update_one(
+        {"_id": submission["assessment_id"]},
+        {
+            "$inc": submission_increments(exam, submission, response_dicts),
+            "$set": {
+                "professor_id": submission["professor_id"],
+                "updated_at": datetime.now(timezone.utc)
+            }
+        },
+        upsert=True
+    )
+
+async def rebuild_exam_stats(db, exam_id: str):
+    try:
+        exam = await db.exams.find_one({"_id": ObjectId(exam_id)}, {"questions": 1, "professor_id": 1})
+    except:
+        exam = None
+
+    stats = {
+        "_id": exam_id,
+        "professor_id": str(exam["professor_id"]) if exam else None,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+    # Load the exam's responses once, grouped per student
+    responses_by_student = {}
+    cursor = db.student_responses.find(
+        {"assessment_id": exam_id},
+        {"student_id": 1, "question_id": 1, "response_text": 1, "is_correct": 1}
+    )
+    async for r in cursor:
+        responses_by_student.setdefault(r["student_id"], []).append(r)
+
+    # Replay every submission through the same increments ingest uses
+    totals = {}
+    async for submission in db.submissions.find({"assessment_id": exam_id}):
+        responses = responses_by_student.get(submission["student_id"], [])
+        for field, n in submission_increments(exam, submission, responses).items():
+            totals[field] = totals.get(field, 0) + n
+
+    # Expand dotted paths into the nested document
+    for path, n in totals.items():
+        node = stats
+        parts = path.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = n
+
+    await db.exam_stats.replace_one({"_id": exam_id}, stats, upsert=True)
+    return stats
+
+async def rebuild_all_exam_stats(db):
+    exam_ids = await db.submissions.distinct("assessment_id")
+    for exam_id in exam_ids:
+        await rebuild_exam_stats(db, exam_id)
+    # Drop stats for exams that no longer have submissions
+    await db.exam_stats.delete_many({"_id": {"$nin": exam_ids}})
+    return len(exam_ids)
@@ -0,0 +1,306 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Optional
+from bson import ObjectId
+from pymongo import ReadPreference
+from app.core.config import settings
+
+# Columnar export of exams, questions, student responses and misconceptions for offline analysis.
+# Layout (hive-style partitions, one file per partition):
+#   <EXPORT_DIR>/<export_id>/exams/institution_id=<id>/part-0.parquet
+#   <EXPORT_DIR>/<export_id>/questions/institution_id=<id>/part-0.parquet
+#   <EXPORT_DIR>/<export_id>/responses/institution_id=<id>/assessment_id=<id>/part-0.parquet
+#   <EXPORT_DIR>/<export_id>/misconceptions/institution_id=<id>/assessment_id=<id>/part-0.parquet
+# Rows are streamed from Mongo cursors exam by exam and written in row groups of
+# EXPORT_ROW_GROUP_SIZE, so memory stays bounded by one row group per open file.
+# Reads go to a secondary when the deployment has one.
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError: # optional dependency: pip install pyarrow
+    pa = None
+
+FORMATS = {"parquet": "parquet", "arrow": "arrow"} # format -> file extension
+UNKNOWN_PARTITION = "unknown"
+
+def export_available() -> bool:
+    return pa is not None
+
+def _schemas() -> dict:
+    ts = pa.timestamp("us", tz="UTC")
+    return {
+        "exams": pa.schema([
+            ("exam_id", pa.string()), ("title", pa.string()), ("subject_id", pa.string()),
+            ("professor_id", pa.string()), ("institution_id", pa.string()),
+            ("created_at", ts), ("schedule_start", ts), ("duration_minutes", pa.int64()),
+            ("question_count", pa.int64()), ("total_marks", pa.float64()),
+            ("results_published", pa.bool_()),
+        ]),
+        "questions": pa.schema([
+            ("exam_id", pa.string()), ("question_id", pa.string()), ("text", pa.string()),
+            ("type", pa.string()), ("correct_answer", pa.string()), ("topic_id", pa.string()),
+            ("topic_name", pa.string()), ("unit", pa.string()), ("marks", pa.float64()),
+        ]),
+        "responses": pa.schema([
+            ("response_id", pa.string()), ("student_id", pa.string()), ("assessment_id", pa.string()),
+            ("question_id", pa.string()), ("response_text", pa.string()), ("is_correct", pa.bool_()),
+            ("marks_awarded", pa.float64()), ("max_marks", pa.float64()), ("submitted_at", ts),
+        ]),
+        "misconceptions": pa.schema([
+            ("misconception_id", pa.string()), ("assessment_id", pa.string()), ("question_id", pa.string()),
+            ("cluster_label", pa.string()), ("student_count", pa.int64()), ("confidence_score", pa.float64()),
+            ("status", pa.string()), ("professor_id", pa.string()), ("institution_id", pa.string()),
+            ("created_at", ts),
+        ]),
+    }
+
+def _str(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+def _num(value) -> Optional[float]:
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _partition(value) -> str:
+    # Partition directory values: keep them path-safe
+    text = str(value) if value else UNKNOWN_PARTITION
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in text)
+
+class PartitionWriter:
+    """Buffers rows for one output file and writes them out one row group at a time."""
+
+    def __init__(self, path: str, schema, fmt: str, row_group_size: int):
+        self.path = path
+        self.schema = schema
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.row_count = 0
+        self._writer = None
+
+    async def write(self, row: dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.rows:
+            return
+        rows, self.rows = self.rows, []
+        # Arrow conversion and file IO are blocking; keep them off the event loop
+        await asyncio.to_thread(self._write_rows, rows)
+        self.row_count += len(rows)
+
+    def _write_rows(self, rows: list):
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self.path, self.schema, compression="zstd")
+            else:
+                self._writer = pa_ipc.new_file(self.path, self.schema)
+        if self.fmt == "parquet":
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_table(table, max_chunksize=self.row_group_size)
+
+    async def close(self):
+        await self.flush()
+        if self._writer is not None:
+            await asyncio.to_thread(self._writer.close)
+            self._writer = None
+
+class AnalyticsExporter:
+    def __init__(self, db, out_dir: str, fmt: str = "parquet", row_group_size: Optional[int] = None):
+        if not export_available():
+            raise RuntimeError("pyarrow is not installed; run `pip install pyarrow` to enable exports")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.db = db
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.row_group_size = row_group_size or settings.EXPORT_ROW_GROUP_SIZE
+        self.schemas = _schemas()
+        self._institution_writers = {} # (dataset, institution) -> PartitionWriter
+        self._institutions = {} # professor_id -> institution_id
+
+    def _collection(self, name: str):
+        return self.db.get_collection(name, read_preference=ReadPreference.SECONDARY_PREFERRED)
+
+    def _path(self, dataset: str, *partitions) -> str:
+        parts = [self.out_dir, dataset] + [f"{k}={_partition(v)}" for k, v in partitions]
+        return os.path.join(*parts, f"part-0.{FORMATS[self.fmt]}")
+
+    def _writer(self, dataset: str, *partitions) -> PartitionWriter:
+        return PartitionWriter(self._path(dataset, *partitions), self.schemas[dataset], self.fmt, self.row_group_size)
+
+    async def _institution_of(self, professor_id: Optional[str]) -> Optional[str]:
+        if not professor_id or not ObjectId.is_valid(str(professor_id)):
+            return None
+        if professor_id not in self._institutions:
+            user = await self._collection("users").find_one({"_id": ObjectId(str(professor_id))}, {"institution_id": 1})
+            self._institutions[professor_id] = _str(user.get("institution_id")) if user else None
+        return self._institutions[professor_id]
+
+    async def _exam_query(self, institution_id: Optional[str], assessment_id: Optional[str]) -> dict:
+        query = {}
+        if assessment_id:
+            try:
+                query["_id"] = ObjectId(assessment_id)
+            except:
+                raise ValueError(f"Invalid assessment id: {assessment_id}")
+        if institution_id:
+            professors = await self._collection("users").distinct("_id", {"institution_id": institution_id})
+            query["professor_id"] = {"$in": [str(p) for p in professors]}
+        return query
+
+    async def run(self, institution_id: Optional[str] = None, assessment_id: Optional[str] = None) -> dict:
+        counts = {"exams": 0, "questions": 0, "responses": 0, "misconceptions": 0}
+        query = await self._exam_query(institution_id, assessment_id)
+        try:
+            cursor = self._collection("exams").find(query).sort("_id", 1)
+            async for exam in cursor:
+                counts["responses"] += await self._export_exam(exam)
+                counts["exams"] += 1
+                counts["questions"] += len(exam.get("questions", []))
+                counts["misconceptions"] += await self._export_misconceptions(exam)
+        finally:
+            for writer in self._institution_writers.values():
+                await writer.close()
+        return counts
+
+    def _institution_writer(self, dataset: str, institution: Optional[str]) -> PartitionWriter:
+        key = (dataset, institution)
+        if key not in self._institution_writers:
+            self._institution_writers[key] = self._writer(dataset, ("institution_id", institution))
+        return self._institution_writers[key]
+
+    async def _export_exam(self, exam: dict) -> int:
+        exam_id = str(exam["_id"])
+        professor_id = _str(exam.get("professor_id"))
+        institution = await self._institution_of(professor_id)
+        questions = exam.get("questions", [])
+
+        # 1. Exam metadata and questions (one file per institution)
+        exams_writer = self._institution_writer("exams", institution)
+        await exams_writer.write({
+            "exam_id": exam_id,
+            "title": exam.get("title"),
+            "subject_id": _str(exam.get("subject_id")),
+            "professor_id": professor_id,
+            "institution_id": institution,
+            "created_at": exam.get("created_at"),
+            "schedule_start": exam.get("schedule_start"),
+            "duration_minutes": exam.get("duration_minutes"),
+            "question_count": len(questions),
+            "total_marks": float(sum(_num(q.get("marks", 1)) or 0 for q in questions)),
+            "results_published": bool(exam.get("results_published", False)),
+        })
+        questions_writer = self._institution_writer("questions", institution)
+        for q in questions:
+            await questions_writer.write({
+                "exam_id": exam_id,
+                "question_id": _str(q.get("id")),
+                "text": q.get("text"),
+                "type": q.get("type"),
+                "correct_answer": _str(q.get("correct_answer")),
+                "topic_id": _str(q.get("topic_id")),
+                "topic_name": q.get("topic_name"),
+                "unit": q.get("unit"),
+                "marks": _num(q.get("marks", 1)),
+            })
+
+        # 2. Raw responses, streamed in batches from the (assessment_id, student_id) index
+        writer = self._writer("responses", ("institution_id", institution), ("assessment_id", exam_id))
+        try:
+            cursor = self._collection("student_responses").find(
+                {"assessment_id": exam_id},
+                {"student_id": 1, "question_id": 1, "response_text": 1, "is_correct": 1,
+                 "marks_awarded": 1, "max_marks": 1, "submitted_at": 1},
+                batch_size=settings.EXPORT_BATCH_SIZE
+            )
+            async for r in cursor:
+                await writer.write({
+                    "response_id": str(r["_id"]),
+                    "student_id": _str(r.get("student_id")),
+                    "assessment_id": exam_id,
+                    "question_id": _str(r.get("question_id")),
+                    "response_text": r.get("response_text"),
+                    "is_correct": bool(r.get("is_correct", False)),
+                    "marks_awarded": _num(r.get("marks_awarded")),
+                    "max_marks": _num(r.get("max_marks")),
+                    "submitted_at": r.get("submitted_at"),
+                })
+        finally:
+            await writer.close()
+        return writer.row_count
+
+    async def _export_misconceptions(self, exam: dict) -> int:
+        exam_id = str(exam["_id"])
+        institution = await self._institution_of(_str(exam.get("professor_id")))
+        writer = self._writer("misconceptions", ("institution_id", institution), ("assessment_id", exam_id))
+        try:
+            cursor = self._collection("misconceptions").find(
+                {"assessment_id": exam_id},
+                {"question_id": 1, "cluster_label": 1, "student_count": 1, "confidence_score": 1,
+                 "status": 1, "professor_id": 1, "institution_id": 1, "created_at": 1},
+                batch_size=settings.EXPORT_BATCH_SIZE
+            )
+            async for m in cursor:
+                await writer.write({
+                    "misconception_id": str(m["_id"]),
+                    "assessment_id": exam_id,
+                    "question_id": _str(m.get("question_id")),
+                    "cluster_label": m.get("cluster_label"),
+                    "student_count": m.get("student_count"),
+                    "confidence_score": _num(m.get("confidence_score")),
+                    "status": m.get("status"),
+                    "professor_id": _str(m.get("professor_id")),
+                    "institution_id": _str(m.get("institution_id")) or institution,
+                    "created_at": m.get("created_at"),
+                })
+        finally:
+            await writer.close()
+        return writer.row_count
+
+def new_export_id() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+async def run_export(db, export_id: str, fmt: str = "parquet",
+                     institution_id: Optional[str] = None, assessment_id: Optional[str] = None) -> dict:
+    """Runs one export and records its progress in the export_jobs collection."""
+    out_dir = os.path.join(settings.EXPORT_DIR, export_id)
+    await db.export_jobs.update_one(
+        {"_id": export_id},
+        {"$set": {
+            "status": "running",
+            "format": fmt,
+            "institution_id": institution_id,
+            "assessment_id": assessment_id,
+            "path": out_dir,
+            "started_at": datetime.now(timezone.utc)
+        }},
+        upsert=True
+    )
+    try:
+        exporter = AnalyticsExporter(db, out_dir, fmt)
+        counts = await exporter.run(institution_id=institution_id, assessment_id=assessment_id)
+    except Exception as e:
+        print(f"[Export] {export_id} failed: {e}")
+        await db.export_jobs.update_one(
+            {"_id": export_id},
+            {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.now(timezone.utc)}}
+        )
+        raise
+
+    await db.export_jobs.update_one(
+        {"_id": export_id},
+        {"$set": {"status": "completed", "counts": counts, "finished_at": datetime.now(timezone.utc)}}
+    )
+    print(f"[Export] {export_id} completed: {counts}")
+    return counts
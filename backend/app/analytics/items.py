@@ -0,0 +1,120 @@
+from typing import List, Optional
+import numpy as np
+
+# Classical item analysis for one exam, computed on a dense student x question score matrix:
+#   difficulty        p-value, mean score on the item as a fraction of its marks
+#   discrimination    corrected point-biserial, item score vs. total score without the item
+#   reliability       KR-20 on correct/incorrect, Cronbach's alpha on marks, and alpha if item deleted
+# Every statistic is a column-wise NumPy operation; nothing loops per question.
+
+async def load_score_matrix(db, exam: dict):
+    """Student x question marks matrix from one projected pass over the exam's responses."""
+    questions = exam.get("questions", [])
+    column = {q["id"]: i for i, q in enumerate(questions)}
+    max_marks = np.array([float(q.get("marks", 1) or 0) for q in questions])
+
+    students = {}
+    rows, cols, marks = [], [], []
+    cursor = db.student_responses.find(
+        {"assessment_id": str(exam["_id"])},
+        {"_id": 0, "student_id": 1, "question_id": 1, "is_correct": 1, "marks_awarded": 1}
+    )
+    async for r in cursor:
+        col = column.get(r.get("question_id"))
+        if col is None:
+            continue # question removed since the exam was taken
+        rows.append(students.setdefault(r["student_id"], len(students)))
+        cols.append(col)
+        awarded = r.get("marks_awarded")
+        marks.append(float(awarded) if awarded is not None else (max_marks[col] if r.get("is_correct") else 0.0))
+
+    scores = np.zeros((len(students), len(questions)))
+    if rows:
+        # Unanswered questions stay at 0; a repeated answer keeps the last one
+        scores[np.array(rows), np.array(cols)] = np.array(marks)
+    return scores, max_marks
+
+def _safe_divide(num, den):
+    num, den = np.asarray(num, dtype=float), np.asarray(den, dtype=float)
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+def _alpha(k, item_variance_sum, total_variance):
+    if k < 2:
+        return np.nan
+    return (k / (k - 1)) * (1 - _safe_divide(item_variance_sum, total_variance))
+
+def item_statistics(scores: np.ndarray, max_marks: np.ndarray) -> dict:
+    n, k = scores.shape
+    if n == 0:
+        empty = np.full(k, np.nan)
+        return {"student_count": 0, "difficulty": empty, "discrimination": empty, "alpha_if_deleted": empty,
+                "kr20": np.nan, "cronbach_alpha": np.nan, "mean_score": np.nan, "score_std": np.nan}
+
+    correct = (scores >= max_marks) & (max_marks > 0) # full marks counts as correct
+    totals = scores.sum(axis=1)
+
+    # Difficulty
+    difficulty = _safe_divide(scores.mean(axis=0), max_marks)
+
+    # Corrected point-biserial: correlate each item with the rest score (total minus that item)
+    centered = scores - scores.mean(axis=0)
+    rest = totals[:, None] - scores
+    rest_centered = rest - rest.mean(axis=0)
+    discrimination = _safe_divide(
+        (centered * rest_centered).sum(axis=0),
+        np.sqrt((centered ** 2).sum(axis=0) * (rest_centered ** 2).sum(axis=0))
+    )
+
+    # Reliability
+    item_var = scores.var(axis=0)
+    total_var = totals.var()
+    p = correct.mean(axis=0)
+    kr20 = _alpha(k, (p * (1 - p)).sum(), correct.sum(axis=1).var())
+    alpha = _alpha(k, item_var.sum(), total_var)
+    # Var(total - item) = Var(total) + Var(item) - 2 Cov(total, item)
+    if k > 2:
+        cov_total = (centered * (totals - totals.mean())[:, None]).mean(axis=0)
+        alpha_if_deleted = _alpha(k - 1, item_var.sum() - item_var, total_var + item_var - 2 * cov_total)
+    else:
+        alpha_if_deleted = np.full(k, np.nan)
+
+    return {
+        "student_count": n,
+        "difficulty": difficulty,
+        "discrimination": discrimination,
+        "alpha_if_deleted": alpha_if_deleted,
+        "kr20": kr20,
+        "cronbach_alpha": alpha,
+        "mean_score": totals.mean(),
+        "score_std": totals.std(),
+    }
+
+def _round(value, digits: int = 4) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits) + 0.0 # no -0.0
+
+def item_analysis_report(exam: dict, scores: np.ndarray, max_marks: np.ndarray) -> dict:
+    stats = item_statistics(scores, max_marks)
+    questions = exam.get("questions", [])
+    items: List[dict] = []
+    for i, q in enumerate(questions):
+        items.append({
+            "question_id": q["id"],
+            "text": q.get("text", ""),
+            "max_marks": float(max_marks[i]),
+            "difficulty": _round(stats["difficulty"][i]),
+            "discrimination": _round(stats["discrimination"][i]),
+            "alpha_if_deleted": _round(stats["alpha_if_deleted"][i]),
+        })
+    return {
+        "assessment_id": str(exam["_id"]),
+        "student_count": stats["student_count"],
+        "question_count": len(questions),
+        "mean_score": _round(stats["mean_score"], 2),
+        "score_std": _round(stats["score_std"], 2),
+        "kr20": _round(stats["kr20"]),
+        "cronbach_alpha": _round(stats["cronbach_alpha"]),
+        "items": items,
+    }
@@ -0,0 +1,167 @@
+import hashlib
+import zlib
+from datetime import datetime, timezone
+from typing import List, Optional
+import numpy as np
+from app.core.config import settings
+from app.analytics.exam_stats import field_key
+from app.analytics.topics import question_topic, GENERAL_TOPIC
+
+# Per-class student x topic mastery, stored sparsely in `mastery_chunks`.
+# A class's students are hashed into MASTERY_CHUNKS documents:
+# {
+#   "_id": "<class_id>:<chunk>", "class_id": ..., "chunk": n,
+#   "topics":   {tkey: {"topic_id", "topic_name", "unit"}},
+#   "students": {skey: {"student_id": email, "t": {tkey: {"c": correct, "a": attempted}}}}
+# }
+# skey is the sha1 hex of the student id (emails contain "." and would otherwise need escaping).
+# Only topics a student has attempted are stored. Ingest $inc's one chunk per class the exam
+# is assigned to; reads load the class's chunks and assemble compact NumPy arrays.
+
+def chunk_of(student_id: str) -> int:
+    return zlib.crc32(student_id.encode("utf-8")) % settings.MASTERY_CHUNKS
+
+def chunk_id(class_id: str, chunk: int) -> str:
+    return f"{class_id}:{chunk}"
+
+def student_key(student_id: str) -> str:
+    return hashlib.sha1(student_id.encode("utf-8")).hexdigest()
+
+def topic_increments(exam: Optional[dict], response_dicts: List[dict]) -> dict:
+    """tkey -> (topic, correct, attempted) for one submission."""
+    questions = {q["id"]: q for q in (exam or {}).get("questions", [])}
+    cells = {}
+    for r in response_dicts:
+        topic = question_topic(questions.get(r["question_id"]))
+        tkey = field_key(topic.get("topic_id") or GENERAL_TOPIC["topic_id"])
+        _, correct, attempted = cells.get(tkey, (topic, 0, 0))
+        cells[tkey] = (topic, correct + (1 if r["is_correct"] else 0), attempted + 1)
+    return cells
+
+def _chunk_update(student_id: str, cells: dict) -> dict:
+    skey = student_key(student_id)
+    inc, topics = {}, {}
+    for tkey, (topic, correct, attempted) in cells.items():
+        inc[f"students.{skey}.t.{tkey}.c"] = correct
+        inc[f"students.{skey}.t.{tkey}.a"] = attempted
+        topics[f"topics.{tkey}"] = topic
+    return {
+        "$inc": inc,
+        "$set": {**topics, f"students.{skey}.student_id": student_id, "updated_at": datetime.now(timezone.utc)}
+    }
+
+async def record_mastery(db, exam: Optional[dict], student_id: str, response_dicts: List[dict]):
+    cells = topic_increments(exam, response_dicts)
+    class_ids = (exam or {}).get("class_ids", [])
+    if not cells or not class_ids:
+        return
+    update = _chunk_update(student_id, cells)
+    chunk = chunk_of(student_id)
+    for class_id in class_ids:
+        await db.mastery_chunks.update_one(
+            {"_id": chunk_id(class_id, chunk)},
+            {**update, "$setOnInsert": {"class_id": class_id, "chunk": chunk}},
+            upsert=True
+        )
+
+def _mastery(correct: np.ndarray, attempted: np.ndarray) -> np.ndarray:
+    out = np.full(attempted.shape, np.nan)
+    np.divide(correct, attempted, out=out, where=attempted > 0)
+    return out
+
+def _cell(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, 4)
+
+async def load_class_mastery(db, class_id: str, student_ids: Optional[List[str]] = None) -> dict:
+    """
+    Class heatmap: topics x enrolled students, assembled from the class's chunks.
+    Cells a student never attempted come back as None.
+    """
+    if student_ids is None:
+        enrollments = await db.class_students.find({"class_id": class_id}, {"student_id": 1}).to_list(None)
+        student_ids = [e["student_id"] for e in enrollments]
+    row = {s: i for i, s in enumerate(student_ids)}
+
+    topics, column = [], {}
+    rows, cols, correct, attempted = [], [], [], []
+    async for doc in db.mastery_chunks.find({"class_id": class_id}):
+        for tkey, topic in doc.get("topics", {}).items():
+            if tkey not in column:
+                column[tkey] = len(topics)
+                topics.append(topic)
+        for student in doc.get("students", {}).values():
+            r = row.get(student.get("student_id"))
+            if r is None:
+                continue # no longer enrolled
+            for tkey, cell in student.get("t", {}).items():
+                rows.append(r)
+                cols.append(column[tkey])
+                correct.append(cell.get("c", 0))
+                attempted.append(cell.get("a", 0))
+
+    # Sparse (row, col, value) triplets -> dense class matrix
+    shape = (len(student_ids), len(topics))
+    correct_m, attempted_m = np.zeros(shape), np.zeros(shape)
+    if rows:
+        np.add.at(correct_m, (rows, cols), correct)
+        np.add.at(attempted_m, (rows, cols), attempted)
+    mastery = _mastery(correct_m, attempted_m)
+
+    # Topic-level class averages over students who attempted the topic
+    topic_correct, topic_attempted = correct_m.sum(axis=0), attempted_m.sum(axis=0)
+    return {
+        "class_id": class_id,
+        "topics": [
+            {**t, "class_mastery": _cell(m), "attempted": int(a)}
+            for t, m, a in zip(topics, _mastery(topic_correct, topic_attempted), topic_attempted)
+        ],
+        "students": student_ids,
+        "mastery": [[_cell(v) for v in r] for r in mastery],
+        "attempted": attempted_m.astype(int).tolist(),
+    }
+
+async def load_student_mastery(db, class_id: str, student_id: str) -> dict:
+    skey = student_key(student_id)
+    doc = await db.mastery_chunks.find_one(
+        {"_id": chunk_id(class_id, chunk_of(student_id))},
+        {"topics": 1, f"students.{skey}": 1}
+    )
+    doc = doc or {}
+    cells = doc.get("students", {}).get(skey, {}).get("t", {})
+    topics = doc.get("topics", {})
+    profile = []
+    for tkey, cell in cells.items():
+        attempted = cell.get("a", 0)
+        profile.append({
+            **topics.get(tkey, {"topic_id": tkey}),
+            "correct": cell.get("c", 0),
+            "attempted": attempted,
+            "mastery": round(cell.get("c", 0) / attempted, 4) if attempted else None,
+        })
+    profile.sort(key=lambda t: (t["mastery"] is None, t["mastery"] or 0))
+    return {"class_id": class_id, "student_id": student_id, "topics": profile}
+
+async def rebuild_class_mastery(db, class_id: str) -> int:
+    # Recompute a class's chunks from the raw responses of every exam assigned to it
+    await db.mastery_chunks.delete_many({"class_id": class_id})
+    count = 0
+    async for exam in db.exams.find({"class_ids": class_id}, {"questions": 1, "class_ids": 1}):
+        by_student = {}
+        cursor = db.student_responses.find(
+            {"assessment_id": str(exam["_id"])},
+            {"_id": 0, "student_id": 1, "question_id": 1, "is_correct": 1}
+        )
+        async for r in cursor:
+            by_student.setdefault(r["student_id"], []).append(r)
+        for student_id, responses in by_student.items():
+            await record_mastery(db, {**exam, "class_ids": [class_id]}, student_id, responses)
+            count += 1
+    return count
+
+async def rebuild_all_mastery(db) -> int:
+    class_ids = [str(c["_id"]) async for c in db.classes.find({}, {"_id": 1})]
+    for class_id in class_ids:
+        await rebuild_class_mastery(db, class_id)
+    await db.mastery_chunks.delete_many({"class_id": {"$nin": class_ids}})
+    return len(class_ids)
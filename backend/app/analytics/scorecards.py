@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from pymongo import ReplaceOne
+
+# One scorecard per (student, exam) in `scorecards`, shaped exactly like the my_result response:
+# {
+#   "_id": "<student_id>:<exam_id>", "student_id", "assessment_id",
+#   "score", "total_marks", "correct_questions", "total_questions", "responses_count",
+#   "questions": [{id, text, type, options, marks, correct_answer, user_answer, is_correct, explanation}]
+# }
+# Materialized for the whole exam when results are published (and again if a published exam is
+# edited), and per student for submissions that arrive after publishing.
+
+SCORECARD_BATCH_SIZE = 500
+RESULT_FIELDS = {"_id": 0, "student_id": 0, "assessment_id": 0, "updated_at": 0}
+
+def scorecard_id(student_id: str, exam_id: str) -> str:
+    return f"{student_id}:{exam_id}"
+
+def build_scorecard(exam: dict, student_id: str, responses: List[dict], submission: Optional[dict]) -> dict:
+    exam_id = str(exam["_id"])
+    questions = exam.get("questions", [])
+    question_marks = {q["id"]: q.get("marks", 1) for q in questions}
+
+    if submission:
+        score = submission["score"]
+        correct_count = submission["correct_count"]
+    else:
+        # Legacy submissions without a summary document
+        score = sum(question_marks.get(r["question_id"], 0) for r in responses if r.get("is_correct", False))
+        correct_count = sum(1 for r in responses if r.get("is_correct", False))
+
+    response_map = {r["question_id"]: r for r in responses}
+    detailed_questions = []
+    for q in questions:
+        response = response_map.get(q["id"])
+        detailed_questions.append({
+            "id": q["id"],
+            "text": q["text"],
+            "type": q.get("type", "mcq"),
+            "options": q.get("options", []),
+            "marks": q.get("marks", 1),
+            "correct_answer": q.get("correct_answer"),
+            "user_answer": response.get("response_text") if response else None,
+            "is_correct": response.get("is_correct", False) if response else False,
+            "explanation": q.get("explanation")
+        })
+
+    return {
+        "_id": scorecard_id(student_id, exam_id),
+        "student_id": student_id,
+        "assessment_id": exam_id,
+        "score": score,
+        "total_marks": sum(question_marks.values()),
+        "correct_questions": correct_count,
+        "total_questions": len(questions),
+        "responses_count": len(responses),
+        "questions": detailed_questions,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+async def save_scorecard(db, scorecard: dict):
+    await db.scorecards.replace_one({"_id": scorecard["_id"]}, scorecard, upsert=True)
+
+async def materialize_scorecards(db, exam: dict) -> int:
+    """Writes every student's scorecard for the exam; one pass over its responses, batched upserts."""
+    exam_id = str(exam["_id"])
+    submissions = {}
+    async for s in db.submissions.find({"assessment_id": exam_id}, {"student_id": 1, "score": 1, "correct_count": 1}):
+        submissions[s["student_id"]] = s
+
+    # Responses arrive grouped by student from the (assessment_id, student_id) index
+    ops, count = [], 0
+    current, responses = None, []
+
+    async def add(student_id, student_responses):
+        nonlocal ops, count
+        ops.append(ReplaceOne(
+            {"_id": scorecard_id(student_id, exam_id)},
+            build_scorecard(exam, student_id, student_responses, submissions.get(student_id)),
+            upsert=True
+        ))
+        count += 1
+        if len(ops) >= SCORECARD_BATCH_SIZE:
+            await db.scorecards.bulk_write(ops, ordered=False)
+            ops = []
+
+    cursor = db.student_responses.find(
+        {"assessment_id": exam_id},
+        {"_id": 0, "student_id": 1, "question_id": 1, "response_text": 1, "is_correct": 1}
+    ).sort([("assessment_id", 1), ("student_id", 1)])
+    async for r in cursor:
+        if r["student_id"] != current:
+            if current is not None:
+                await add(current, responses)
+            current, responses = r["student_id"], []
+        responses.append(r)
+    if current is not None:
+        await add(current, responses)
+    if ops:
+        await db.scorecards.bulk_write(ops, ordered=False)
+    return count
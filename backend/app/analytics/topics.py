@@ -0,0 +1,201 @@
+import re
+from collections import OrderedDict, deque
+from typing import List, Optional
+from bson import ObjectId
+
+# Topic tagging for exam questions.
+# A subject's syllabus ([{unit: "Unit 1", topics: ["Normalization", ...]}]) is compiled
+# once per syllabus version into an Aho-Corasick automaton, and every question is tagged
+# in a single pass over its text when the exam is saved. Analytics reads the stored tags.
+
+GENERAL_TOPIC = {"topic_id": "general", "topic_name": "Core Concepts", "unit": "Unit 1"}
+
+# Used when a subject has no syllabus yet (and for questions saved before tagging existed)
+DEFAULT_SYLLABUS = [
+    {"unit": "Unit 1", "topics": [
+        {"name": "Normalization (3NF/BCNF)", "keywords": ["normalization", "normal form"]},
+        {"name": "SQL Query Structure", "keywords": ["sql"]},
+        {"name": "Indexing Strategies", "keywords": ["index"]},
+        {"name": "Transaction Management", "keywords": ["transaction"]},
+        {"name": "Data Integrity", "keywords": ["integrity"]},
+        {"name": "Keys & Constraints", "keywords": ["key", "constraint"]},
+    ]}
+]
+
+STOPWORDS = {"and", "the", "of", "for", "with", "in", "to", "a", "an", "on", "vs", "using"}
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-") or "topic"
+
+def topic_keywords(name: str, extra: List[str]) -> List[str]:
+    # Full name, the name without parentheticals, parenthetical parts, and significant words
+    name = name.lower().strip()
+    base = re.sub(r"\(.*?\)", "", name).strip()
+    keywords = {name, base}
+    for inner in re.findall(r"\((.*?)\)", name):
+        keywords.update(p.strip() for p in inner.split("/"))
+    for w in re.split(r"[^a-z0-9]+", base):
+        if len(w) >= 4 and w not in STOPWORDS:
+            keywords.add(w)
+            if w.endswith("s") and len(w) > 4:
+                keywords.add(w[:-1]) # "joins" should also match "join"
+    keywords.update(k.lower().strip() for k in extra)
+    return [k for k in keywords if k]
+
+def _is_word_char(text: str, i: int) -> bool:
+    return 0 <= i < len(text) and text[i].isalnum()
+
+class TopicMatcher:
+    """Multi-pattern (Aho-Corasick) matcher from keywords to syllabus topics."""
+
+    def __init__(self, syllabus: List[dict]):
+        self.topics = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]] # node -> [(topic index, keyword length)]
+
+        for unit_idx, unit in enumerate(syllabus or []):
+            unit_name = unit.get("unit") or f"Unit {unit_idx + 1}"
+            for topic in unit.get("topics", []):
+                if isinstance(topic, dict):
+                    name, extra = topic.get("name", ""), topic.get("keywords", [])
+                else:
+                    name, extra = str(topic), []
+                if not name.strip():
+                    continue
+                index = len(self.topics)
+                self.topics.append({
+                    "topic_id": f"{slugify(unit_name)}-{slugify(name)}",
+                    "topic_name": name,
+                    "unit": unit_name
+                })
+                for keyword in topic_keywords(name, extra):
+                    self._add(keyword, index)
+        self._build()
+        self._by_id = {t["topic_id"]: t for t in self.topics}
+
+    def _add(self, keyword: str, topic_index: int):
+        node = 0
+        for ch in keyword:
+            if ch not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = len(self._goto) - 1
+            node = self._goto[node][ch]
+        self._out[node].append((topic_index, len(keyword)))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def match(self, text: str) -> Optional[dict]:
+        # Score topics by total matched keyword length; ties go to syllabus order.
+        # Only whole-word matches count ("data" must not match inside "database").
+        text = (text or "").lower()
+        scores = {}
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            if not self._out[node] or _is_word_char(text, i + 1):
+                continue
+            for topic_index, length in self._out[node]:
+                if _is_word_char(text, i - length):
+                    continue
+                scores[topic_index] = scores.get(topic_index, 0) + length
+        if not scores:
+            return None
+        best = min(scores, key=lambda i: (-scores[i], i))
+        return self.topics[best]
+
+    def get(self, topic_id: str) -> Optional[dict]:
+        return self._by_id.get(topic_id)
+
+default_matcher = TopicMatcher(DEFAULT_SYLLABUS)
+
+# --- Per-subject cache, keyed by syllabus version ---
+
+MAX_CACHED_SUBJECTS = 256
+_matchers = OrderedDict() # (subject_id, syllabus_version) -> TopicMatcher
+
+async def get_subject_matcher(db, subject_id: str) -> TopicMatcher:
+    if not subject_id or not ObjectId.is_valid(str(subject_id)):
+        return default_matcher
+    subject = await db.subjects.find_one(
+        {"_id": ObjectId(str(subject_id))}, {"syllabus": 1, "syllabus_version": 1}
+    )
+    if not subject or not subject.get("syllabus"):
+        return default_matcher
+
+    key = (str(subject_id), subject.get("syllabus_version", 0))
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = TopicMatcher(subject["syllabus"])
+        _matchers[key] = matcher
+        while len(_matchers) > MAX_CACHED_SUBJECTS:
+            _matchers.popitem(last=False)
+    else:
+        _matchers.move_to_end(key)
+    return matcher
+
+def is_syllabus_tag(question: dict) -> bool:
+    # Tag assigned from a syllabus rather than typed by the professor: its topic_id is still the
+    # "<unit>-<topic>" slug of its stored name (an edited topic_id no longer is, even if the
+    # client sent auto_tagged back). Questions saved before the flag existed have no flag.
+    if question.get("auto_tagged") is False:
+        return False
+    name, unit = question.get("topic_name"), question.get("unit")
+    return bool(name and unit) and question.get("topic_id") == f"{slugify(unit)}-{slugify(name)}"
+
+def tag_question(matcher: TopicMatcher, question: dict) -> dict:
+    # Keep an existing syllabus tag; map a professor's free-text tag onto the syllabus;
+    # otherwise tag from the question text. A syllabus tag the current syllabus no longer
+    # has is re-derived from the text, never kept as a free-text name.
+    current = str(question.get("topic_id") or "").strip()
+    topic = matcher.get(current)
+    free_text = False
+    if topic is None and current and current != GENERAL_TOPIC["topic_id"] and not is_syllabus_tag(question):
+        topic = matcher.match(current)
+        if topic is None:
+            topic = {"topic_id": current, "topic_name": current, "unit": GENERAL_TOPIC["unit"]}
+            free_text = True
+    if topic is None:
+        topic = matcher.match(question.get("text", "")) or GENERAL_TOPIC
+    question.update(topic)
+    question["auto_tagged"] = not free_text
+    return question
+
+async def tag_questions(db, subject_id: str, questions: List[dict]) -> List[dict]:
+    matcher = await get_subject_matcher(db, subject_id)
+    for q in questions:
+        tag_question(matcher, q)
+    return questions
+
+def question_topic(question: Optional[dict]) -> dict:
+    """Stored topic tags of a question, tagging untagged (legacy) questions on the fly."""
+    if not question:
+        return GENERAL_TOPIC
+    if question.get("topic_name"):
+        return {"topic_id": question.get("topic_id"), "topic_name": question["topic_name"], "unit": question.get("unit") or GENERAL_TOPIC["unit"]}
+    return default_matcher.match(question.get("text", "")) or GENERAL_TOPIC
+
+async def retag_subject_exams(db, subject_id: str) -> int:
+    # Re-apply tags after a syllabus change, one exam update per exam of the subject
+    matcher = await get_subject_matcher(db, subject_id)
+    count = 0
+    async for exam in db.exams.find({"subject_id": str(subject_id)}, {"questions": 1}):
+        questions = [tag_question(matcher, q) for q in exam.get("questions", [])]
+        await db.exams.update_one({"_id": exam["_id"]}, {"$set": {"questions": questions}})
+        count += 1
+    return count
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import ingest, analytics, teacher, subjects, exams, auth, institutes, professors, classes, notifications
+from app.api.v1.endpoints import ingest, analytics, teacher, subjects, exams, auth, institutes, professors, classes, notifications, drafts, exports
 
 api_router = APIRouter()
 
@@ -13,4 +13,5 @@ api_router.include_router(institutes.router, prefix="/institutes", tags=["instit
 api_router.include_router(professors.router, prefix="/professors", tags=["professors"])
 api_router.include_router(classes.router, prefix="/classes", tags=["classes"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
-
+api_router.include_router(drafts.router, prefix="/drafts", tags=["drafts"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
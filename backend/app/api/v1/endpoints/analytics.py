@@ -1,139 +1,205 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from typing import List, Optional
 from app.db.mongodb import get_database
 from app.models.schemas import DetectedMisconception
 from bson import ObjectId
 from app.core.security import get_current_user
+from app.db.fanout import fan_out
+from app.core.cache import cached_json_response, bump_data_version, professor_scope, exam_scope
+from app.analytics.topics import GENERAL_TOPIC
+from app.kiro.enrichment import refresh_enrichment
+from app.analytics.counters import read_counters, record_status_change
+from app.analytics.items import load_score_matrix, item_analysis_report
+from app.analytics.distractors import build_distractor_report
 from collections import defaultdict
+from datetime import datetime
+import base64
+import json
 
 router = APIRouter()
 
+# Stored misconception fields the grouped view projects
+MISCONCEPTION_VIEW_FIELDS = {
+    "assessment_id": 1, "question_id": 1, "student_count": 1, "confidence_score": 1, "status": 1,
+    "example_ids": 1, "cluster_label": 1, "question_text": 1, "incorrect_answer": 1, "reasoning": 1,
+    "concept_chain": 1, "topic_name": 1, "evidence": 1, "enrichment_key": 1, "enriched_at": 1
+}
+
+# With `fields`, only these are always read (the impact summary and item ids need them);
+# the rest come from the requested item fields
+MISCONCEPTION_BASE_FIELDS = {
+    "assessment_id": 1, "question_id": 1, "student_count": 1, "confidence_score": 1, "status": 1,
+    "topic_name": 1, "enriched_at": 1
+}
+MISCONCEPTION_ITEM_SOURCES = {
+    "question_text": ["question_text"],
+    "cluster_label": ["incorrect_answer"],
+    "reasoning": ["reasoning"],
+    "concept_chain": ["concept_chain"],
+    "evidence": ["evidence"],
+}
+
+def misconception_projection(field_set: Optional[set]) -> dict:
+    if field_set is None:
+        return MISCONCEPTION_VIEW_FIELDS
+    projection = dict(MISCONCEPTION_BASE_FIELDS)
+    for name in field_set:
+        for source in MISCONCEPTION_ITEM_SOURCES.get(name, []):
+            projection[source] = 1
+    return projection
+
+def encode_exam_cursor(exam: dict) -> str:
+    created_at = exam.get("created_at")
+    payload = {"c": created_at.isoformat() if created_at else None, "id": str(exam["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_exam_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(payload["c"]) if payload["c"] else None
+        return {"created_at": created_at, "_id": ObjectId(payload["id"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def exam_keyset_filter(position: dict) -> dict:
+    # Next page of (created_at desc, _id desc): strictly older, or same timestamp with a smaller id
+    return {"$or": [
+        {"created_at": {"$lt": position["created_at"]}},
+        {"created_at": position["created_at"], "_id": {"$lt": position["_id"]}}
+    ]}
+
 @router.get("/misconceptions/grouped", response_model=List[dict])
-async def get_grouped_misconceptions(status: str = "valid", current_user: dict = Depends(get_current_user)):
+async def get_grouped_misconceptions(
+    request: Request,
+    status: str = "valid",
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    exam_id: Optional[str] = None,
+    question_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    # Pages are exam groups ordered newest first; the next page's cursor is returned in X-Next-Cursor.
+    # `fields` is a comma-separated list of misconception fields to return (e.g. skip "evidence").
+    professor_id = str(current_user["_id"])
+    field_set = {f.strip() for f in fields.split(",") if f.strip()} if fields else None
+    params = {
+        "status": status, "cursor": cursor, "limit": limit,
+        "exam_id": exam_id, "question_id": question_id, "fields": fields
+    }
+    return await cached_json_response(
+        request, "misconceptions/grouped", professor_id, params,
+        professor_scope(professor_id),
+        lambda: build_grouped_misconceptions(
+            professor_id, status, cursor, limit, exam_id, question_id, field_set
+        ),
+        with_headers=True
+    )
+
+async def build_grouped_misconceptions(
+    professor_id: str,
+    status: str,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    exam_id: Optional[str] = None,
+    question_id: Optional[str] = None,
+    field_set: Optional[set] = None
+):
     db = await get_database()
     
-    # 1. Fetch all misconceptions (optionally filtered by status)
-    # Note: In a real app, we should also filter by exams belonging to this professor
-    query = {}
+    # 1. Which of this professor's exams have matching misconceptions (index-only on the owner index)
+    query = {"professor_id": professor_id}
     if status != "all":
         query["status"] = status
+    if exam_id:
+        query["assessment_id"] = exam_id
+    if question_id:
+        query["question_id"] = question_id
         
-    cursor = db.misconceptions.find(query)
-    all_misconceptions = await cursor.to_list(1000)
-    
-    # 2. Group by Assessment ID
-    from collections import defaultdict
-    grouped = defaultdict(list)
-    assessment_ids = set()
+    candidate_ids = await db.misconceptions.distinct("assessment_id", query)
     
-    for m in all_misconceptions:
-        aid = m["assessment_id"]
-        grouped[aid].append(m)
-        assessment_ids.add(aid)
-        
-    # 3. Fetch Exam Metadata for these assessments
-    # We need to filter to only exams owned by the current professor to ensure security
-    # But for now, we'll just fetch info for the found IDs and let the frontend/logic filter if needed?
-    # Better: Fetch exams for this professor, and valid misconceptions are those associated with these exams.
+    # 2. One page of those exams by (created_at, _id) keyset
+    exam_query = {
+        "_id": {"$in": [ObjectId(aid) for aid in candidate_ids if ObjectId.is_valid(aid)]},
+        "professor_id": professor_id
+    }
+    if cursor:
+        exam_query.update(exam_keyset_filter(decode_exam_cursor(cursor)))
+    exams_cursor = db.exams.find(
+        exam_query,
+        {"title": 1, "subject_id": 1, "created_at": 1, "professor_id": 1}
+    ).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1)
+    exams = await exams_cursor.to_list(limit + 1)
     
-    # 3. Fetch Exam Metadata
-    exams_cursor = db.exams.find({"_id": {"$in": [ObjectId(aid) for aid in assessment_ids]}})
-    exams = await exams_cursor.to_list(100)
+    next_cursor = None
+    if len(exams) > limit:
+        exams = exams[:limit]
+        next_cursor = encode_exam_cursor(exams[-1])
     exam_map = {str(e["_id"]): e for e in exams}
+    assessment_ids = list(exam_map.keys())
+    
+    # 3. Misconceptions for this page only (display fields were stored by KIRO), read concurrently
+    #    with the "attempted" count per exam (students who submitted) maintained at ingest
+    query["assessment_id"] = {"$in": assessment_ids}
+    projection = misconception_projection(field_set)
+    reads = await fan_out(
+        "analytics.grouped",
+        misconceptions=lambda: db.misconceptions.find(query, projection).to_list(None),
+        stats=lambda: db.exam_stats.find({"_id": {"$in": assessment_ids}}, {"attempt_count": 1}).to_list(None),
+    )
+    all_misconceptions = reads["misconceptions"]
+    attempts_map = {doc["_id"]: doc.get("attempt_count", 0) for doc in reads["stats"]}
 
-    # 3a. Calculate "Attempted" count per exam (Unique students who submitted)
-    # We can do this by aggregating student_responses
-    pipeline = [
-        {"$match": {"assessment_id": {"$in": list(assessment_ids)}}},
-        {"$group": {"_id": "$assessment_id", "students": {"$addToSet": "$student_id"}}}
-    ]
-    attempts_cursor = db.student_responses.aggregate(pipeline)
-    attempts_map = {}
-    async for doc in attempts_cursor:
-        attempts_map[doc["_id"]] = len(doc["students"])
-
-    # 3b. Fetch Student Responses for Evidence Preview (Bulk fetch for performance)
-    # Collect all example_ids from all visible misconceptions
-    all_example_ids = []
+    # Documents created before enrichment was stored get it once, here
+    missing = [m for m in all_misconceptions if not m.get("enriched_at")]
+    if missing:
+        if projection is not MISCONCEPTION_VIEW_FIELDS:
+            # Enrichment needs the whole view (example ids, labels), not the trimmed projection
+            full = await db.misconceptions.find(
+                {"_id": {"$in": [m["_id"] for m in missing]}}, MISCONCEPTION_VIEW_FIELDS
+            ).to_list(None)
+            await refresh_enrichment(db, full)
+            by_id = {m["_id"]: m for m in full}
+            for m in missing:
+                m.update(by_id.get(m["_id"], {}))
+        else:
+            await refresh_enrichment(db, missing)
+    
+    grouped = defaultdict(list)
     for m in all_misconceptions:
-        if "example_ids" in m:
-            all_example_ids.extend([ObjectId(eid) for eid in m["example_ids"]])
-            
-    response_map = {}
-    if all_example_ids:
-        resp_cursor = db.student_responses.find({"_id": {"$in": all_example_ids}})
-        resps = await resp_cursor.to_list(1000)
-        response_map = {str(r["_id"]): r["response_text"] for r in resps}
+        grouped[m["assessment_id"]].append(m)
 
-    # 4. Construct Response
+    # 4. Construct Response (in page order)
     result = []
     
-    for aid, misconceptions in grouped.items():
-        if aid not in exam_map: continue
-        exam = exam_map[aid]
-        if str(exam["professor_id"]) != str(current_user["_id"]): continue
+    for exam in exams:
+        aid = str(exam["_id"])
+        misconceptions = grouped.get(aid)
+        if not misconceptions: continue
         
-        questions_map = {q["id"]: q for q in exam.get("questions", [])}
         enriched_list = []
         
         # Calculate topic struggles for Impact Summary
         topic_counts = defaultdict(int)
 
         for m in misconceptions:
-            q_id = m["question_id"]
-            question = questions_map.get(q_id)
-            label = m["cluster_label"]
-            
-            # --- AI Reasoning Generation ---
-            # Try to extract the incorrect answer from label
-            incorrect_answer = "an incorrect option"
-            if "'" in label:
-                incorrect_answer = label.split("'")[1]
-            
-            reasoning = (
-                f"The AI detected that {m['student_count']} students selected '{incorrect_answer}'. "
-                f"This systematic pattern suggests a confusion between the correct concept and '{incorrect_answer}', "
-                "likely due to misinterpreting the question context."
-            )
-            
-            # --- Concept Chain (Simulated per question logic) ---
-            # In real system, this comes from Quesion -> Topic link.
-            # We will use Exam Subject + Mock topics for "AI feel"
-            subject = exam.get("subject_id", "General") 
-            topic = "Core Concepts"
-            if question and "text" in question:
-                # Simple keyword matching for "smart" tagging
-                q_text = question["text"].lower()
-                if "normalization" in q_text: topic = "Normalization (3NF/BCNF)"
-                elif "sql" in q_text: topic = "SQL Query Structure"
-                elif "index" in q_text: topic = "Indexing Strategies"
-                elif "transaction" in q_text: topic = "Transaction Management"
-            
-            concept_chain = [subject, "Unit 1", topic]
-            topic_counts[topic] += m["student_count"]
-
-            # --- Evidence Collection ---
-            evidence = []
-            if "example_ids" in m:
-                for eid in m["example_ids"]:
-                    if eid in response_map:
-                        evidence.append(response_map[eid])
-            # Fallback if no specific examples (shouldn't happen with valid clusters)
-            if not evidence: 
-                evidence = [incorrect_answer] * min(3, m["student_count"])
-
-            enriched_list.append({
+            topic_counts[m.get("topic_name") or GENERAL_TOPIC["topic_name"]] += m["student_count"]
+
+            item = {
                 "id": str(m["_id"]),
-                "question_id": q_id,
-                "question_text": question["text"] if question else "Unknown Question",
-                "cluster_label": "Observed Incorrect Pattern: " + incorrect_answer, # Renamed as requested
+                "question_id": m["question_id"],
+                "question_text": m.get("question_text", "Unknown Question"),
+                "cluster_label": "Observed Incorrect Pattern: " + m.get("incorrect_answer", ""), # Renamed as requested
                 "student_count": m["student_count"],
                 "confidence_score": m["confidence_score"],
                 "status": m["status"],
-                "reasoning": reasoning,
-                "concept_chain": concept_chain,
-                "evidence": evidence[:3] # Limit to 3 quotes
-            })
+                "reasoning": m.get("reasoning"),
+                "concept_chain": m.get("concept_chain", []),
+                "evidence": m.get("evidence", [])[:3] # Limit to 3 quotes
+            }
+            if field_set is not None:
+                item = {k: v for k, v in item.items() if k == "id" or k in field_set}
+            enriched_list.append(item)
         
         # --- Impact Summary ---
         max_topic = max(topic_counts, key=topic_counts.get) if topic_counts else "General"
@@ -154,19 +220,27 @@ async def get_grouped_misconceptions(status: str = "valid", current_user: dict =
             "misconceptions": enriched_list
         })
         
-    return result
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return result, headers
 
 @router.get("/dashboard/stats")
-async def get_dashboard_stats():
+async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
     db = await get_database()
-    pending_count = await db.misconceptions.count_documents({"status": "pending"})
-    valid_count = await db.misconceptions.count_documents({"status": "valid"})
-    total_responses = await db.student_responses.count_documents({})
+    # Pre-aggregated counter shards for the caller's scope, instead of counting collections
+    if current_user["role"] == "admin":
+        scope = "global"
+    elif current_user["role"] == "professor":
+        scope = professor_scope(current_user["_id"])
+    elif current_user.get("institution_id"):
+        scope = f"institution:{current_user['institution_id']}"
+    else:
+        raise HTTPException(status_code=403, detail="Not authorized to view dashboard stats")
+    counters = await read_counters(db, scope)
     
     return {
-        "pending_misconceptions": pending_count,
-        "valid_misconceptions": valid_count,
-        "processed_responses": total_responses # Simplified
+        "pending_misconceptions": counters["pending_misconceptions"],
+        "valid_misconceptions": counters["valid_misconceptions"],
+        "processed_responses": counters["processed_responses"]
     }
 
 @router.get("/misconceptions", response_model=List[DetectedMisconception])
@@ -191,71 +265,14 @@ async def get_misconception_detail(id: str):
     if not misconception:
         raise HTTPException(status_code=404, detail="Misconception not found")
     
-    # --- Enrichment Logic (Defensive) ---
-    try:
-        misconception["_id"] = str(misconception["_id"])
-        
-        # 1. Fetch Exam & Question
-        if "assessment_id" in misconception and misconception["assessment_id"]:
-            try:
-                # Handle both String and ObjectId formats in DB
-                aid_raw = misconception["assessment_id"]
-                aid_obj = ObjectId(aid_raw) if ObjectId.is_valid(str(aid_raw)) else None
-                
-                if aid_obj:
-                    exam = await db.exams.find_one({"_id": aid_obj})
-                    if exam and "questions" in exam:
-                        # Find question by string ID match
-                        q_target_id = str(misconception.get("question_id", ""))
-                        question = next((q for q in exam["questions"] if str(q.get("id")) == q_target_id), None)
-                        
-                        if question:
-                            misconception["question_text"] = question.get("text", "Question text not found")
-                            misconception["options"] = question.get("options", [])
-                            
-                            # Synthesize topics
-                            q_text = question.get("text", "").lower()
-                            topic = "Core Concepts"
-                            if "normalization" in q_text: topic = "Normalization (3NF/BCNF)"
-                            elif "sql" in q_text: topic = "SQL Query Structure"
-                            elif "index" in q_text: topic = "Indexing Strategies"
-                            elif "transaction" in q_text: topic = "Transaction Management"
-                            elif "integrity" in q_text: topic = "Data Integrity"
-                            
-                            subject = exam.get("subject_id", "General")
-                            misconception["concept_chain"] = [subject, "Unit 1", topic]
-            except Exception as e:
-                print(f"Error fetching exam details: {e}")
-
-        # 2. Synthesize Reasoning
-        label = misconception.get("cluster_label", "")
-        incorrect_answer = "an incorrect option"
-        if "'" in label:
-            try:
-                incorrect_answer = label.split("'")[1]
-            except:
-                pass
-        
-        misconception["reasoning"] = (
-            f"The AI detected that {misconception.get('student_count', 0)} students selected '{incorrect_answer}'. "
-            f"This systematic pattern suggests a confusion between the correct concept and '{incorrect_answer}', "
-            "likely due to misinterpreting the specific constraints in the question."
-        )
-
-        # 3. Fetch Evidence
-        if "example_ids" in misconception and misconception["example_ids"]:
-            try:
-                # Filter valid ObjectIds only
-                example_eids = [ObjectId(eid) for eid in misconception["example_ids"] if ObjectId.is_valid(str(eid))]
-                if example_eids:
-                    responses = await db.student_responses.find({"_id": {"$in": example_eids}}).to_list(10)
-                    misconception["evidence"] = [r.get("response_text", "") for r in responses]
-            except Exception as e:
-                print(f"Error fetching evidence: {e}")
-
-    except Exception as e:
-        print(f"Critical error in enrichment: {e}")
-        pass
+    # Enrichment (question, reasoning, concept chain, evidence) is stored on the document;
+    # only documents created before that existed are enriched here, once.
+    if not misconception.get("enriched_at"):
+        try:
+            await refresh_enrichment(db, [misconception])
+        except Exception as e:
+            print(f"Error enriching misconception {id}: {e}")
+    misconception["_id"] = str(misconception["_id"])
 
     # --- Type Coercion for Pydantic ---
     # Ensure all ObjectId fields are strings to pass validation
@@ -283,65 +300,115 @@ async def update_misconception_status(id: str, update: StatusUpdate, current_use
         raise HTTPException(status_code=400, detail="Invalid ID")
         
     # Verify ownership (via exam -> professor)
-    result = await db.misconceptions.update_one(
+    result = await db.misconceptions.find_one_and_update(
         {"_id": obj_id},
-        {"$set": {"status": update.status}}
+        {"$set": {"status": update.status}},
+        projection={"professor_id": 1, "institution_id": 1, "status": 1}
     )
     
-    if result.matched_count == 0:
+    if result is None:
         raise HTTPException(status_code=404, detail="Misconception not found")
+
+    await record_status_change(db, result, update.status)
+
+    await bump_data_version(professor_scope(result.get("professor_id") or current_user["_id"]))
         
     return {"status": "success", "new_status": update.status}
 
 @router.get("/reports/trends", response_model=dict)
-async def get_misconception_trends(current_user: dict = Depends(get_current_user)):
+async def get_misconception_trends(
+    request: Request,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    subject_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    professor_id = str(current_user["_id"])
+    params = {
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "subject_id": subject_id
+    }
+    return await cached_json_response(
+        request, "reports/trends", professor_id, params,
+        professor_scope(professor_id),
+        lambda: build_misconception_trends(professor_id, start_date, end_date, subject_id)
+    )
+
+async def build_misconception_trends(
+    professor_id: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    subject_id: Optional[str] = None
+) -> dict:
     db = await get_database()
     
-    # 1. Fetch all exams for this professor (sorted by creation date)
-    exams_cursor = db.exams.find({"professor_id": str(current_user["_id"])}).sort("created_at", 1)
-    exams = await exams_cursor.to_list(100)
+    exam_match = {"professor_id": professor_id}
+    if subject_id:
+        exam_match["subject_id"] = subject_id
+    if start_date or end_date:
+        exam_match["created_at"] = {}
+        if start_date: exam_match["created_at"]["$gte"] = start_date
+        if end_date: exam_match["created_at"]["$lte"] = end_date
+    
+    # 1. Exams in range for this professor (sorted by creation date, metadata only)
+    exams_cursor = db.exams.find(exam_match, {"title": 1, "created_at": 1}).sort("created_at", 1)
+    exams = await exams_cursor.to_list(None)
     
     if not exams:
         return {"summary": "No exams found to analyze trends.", "matrix": []}
         
-    exam_map = {str(e["_id"]): e for e in exams}
     exam_ids = [str(e["_id"]) for e in exams]
     exam_titles = {str(e["_id"]): e.get("title", f"Exam {i+1}") for i, e in enumerate(exams)}
     
-    # 2. Fetch all VALID misconceptions for these exams
-    # We only care about validated patterns for high-level reports
-    cursor = db.misconceptions.find({
-        "assessment_id": {"$in": exam_ids},
-        "status": "valid" 
-    })
-    misconceptions = await cursor.to_list(1000)
+    # 2. Topic x Exam counts of VALID misconceptions, computed on the server
+    # Each misconception is joined to its question's precomputed syllabus tag.
+    pipeline = [
+        {"$match": exam_match},
+        {"$project": {"aid": {"$toString": "$_id"}, "questions.id": 1, "questions.topic_name": 1}},
+        {"$lookup": {
+            "from": "misconceptions",
+            "let": {"aid": "$aid"},
+            "pipeline": [
+                {"$match": {
+                    "professor_id": professor_id,
+                    "status": "valid",
+                    "$expr": {"$eq": ["$assessment_id", "$$aid"]}
+                }},
+                {"$project": {"question_id": 1}}
+            ],
+            "as": "misconception"
+        }},
+        {"$unwind": "$misconception"},
+        {"$project": {
+            "aid": 1,
+            "question": {"$arrayElemAt": [
+                {"$filter": {
+                    "input": "$questions",
+                    "as": "q",
+                    "cond": {"$eq": ["$$q.id", "$misconception.question_id"]}
+                }},
+                0
+            ]}
+        }},
+        {"$group": {
+            "_id": {"topic": {"$ifNull": ["$question.topic_name", GENERAL_TOPIC["topic_name"]]}, "aid": "$aid"},
+            "count": {"$sum": 1}
+        }},
+        {"$group": {
+            "_id": "$_id.topic",
+            "exams": {"$push": {"k": "$_id.aid", "v": "$count"}},
+            "total": {"$sum": "$count"}
+        }},
+        {"$project": {"total": 1, "exams": {"$arrayToObject": "$exams"}}},
+        {"$sort": {"total": -1, "_id": 1}}
+    ]
     
-    # 3. Build Topic Matrix
+    # 3. Topic Matrix
     # Structure: { "TopicName": { "ExamID": Count, ... } }
-    topic_matrix = defaultdict(lambda: defaultdict(int))
-    
-    # Pre-fetch questions for topic tagging
-    questions_map = {}
-    for e in exams:
-        for q in e.get("questions", []):
-            questions_map[q["id"]] = q
-            
-    for m in misconceptions:
-        # Determine Topic (Simulated logic same as grouped endpoint)
-        q_id = m["question_id"]
-        question = questions_map.get(q_id)
-        topic = "General Concepts"
-        
-        if question and "text" in question:
-            q_text = question["text"].lower()
-            if "normalization" in q_text: topic = "Normalization"
-            elif "sql" in q_text: topic = "SQL Structure"
-            elif "index" in q_text: topic = "Indexing"
-            elif "transaction" in q_text: topic = "Transactions"
-            elif "key" in q_text: topic = "Keys & Constraints"
-            
-        aid = m["assessment_id"]
-        topic_matrix[topic][aid] += 1
+    topic_matrix = {}
+    async for doc in db.exams.aggregate(pipeline):
+        topic_matrix[doc["_id"]] = doc["exams"]
         
     # 4. Format for Frontend
     # [ { topic: "SQL", history: [ { exam: "Test 1", status: "Clean" }, ... ] } ]
@@ -397,22 +464,41 @@ async def get_misconception_trends(current_user: dict = Depends(get_current_user
 
 
 @router.get("/assessments", response_model=List[dict])
-async def get_assessment_summaries(current_user: dict = Depends(get_current_user)):
+async def get_assessment_summaries(request: Request, current_user: dict = Depends(get_current_user)):
+    professor_id = str(current_user["_id"])
+    return await cached_json_response(
+        request, "assessments", professor_id, {},
+        professor_scope(professor_id),
+        lambda: build_assessment_summaries(professor_id)
+    )
+
+async def build_assessment_summaries(professor_id: str) -> List[dict]:
     db = await get_database()
     
-    # 1. Get all exams for this professor
-    exams_cursor = db.exams.find({"professor_id": str(current_user["_id"])})
+    # 1. Get all exams for this professor (metadata only, no questions)
+    exams_cursor = db.exams.find(
+        {"professor_id": professor_id},
+        {"title": 1, "subject_id": 1, "created_at": 1}
+    )
     exams = await exams_cursor.to_list(100)
+    exam_ids = [str(e["_id"]) for e in exams]
+    
+    # 2. Read the incrementally maintained counters for all exams at once
+    stats_cursor = db.exam_stats.find(
+        {"_id": {"$in": exam_ids}},
+        {"attempt_count": 1, "correct_count": 1, "response_count": 1}
+    )
+    totals_map = {}
+    async for doc in stats_cursor:
+        totals_map[doc["_id"]] = doc
     
     summaries = []
     
     for exam in exams:
         exam_id = str(exam["_id"])
+        totals = totals_map.get(exam_id)
         
-        # 2. Get all responses for this exam
-        responses = await db.student_responses.find({"assessment_id": exam_id}).to_list(10000)
-        
-        if not responses:
+        if not totals or not totals.get("attempt_count"):
             summaries.append({
                 "id": exam_id,
                 "title": exam.get("title", "Untitled Exam"),
@@ -423,9 +509,8 @@ async def get_assessment_summaries(current_user: dict = Depends(get_current_user
             continue
 
         # 3. Aggregate
-        student_ids = set(r["student_id"] for r in responses)
-        total_correct = sum(1 for r in responses if r.get("is_correct", False))
-        total_responses = len(responses)
+        total_correct = totals.get("correct_count", 0)
+        total_responses = totals.get("response_count", 0)
         
         avg_score = 0
         if total_responses > 0:
@@ -436,9 +521,43 @@ async def get_assessment_summaries(current_user: dict = Depends(get_current_user
             "title": exam.get("title", "Untitled Exam"),
             "subject_id": exam.get("subject_id"),
             "created_at": exam.get("created_at"),
-            "total_students": len(student_ids),
+            "total_students": totals["attempt_count"],
             "avg_score": round(avg_score, 1),
             "status": "Active"
         })
         
     return summaries
+
+async def get_owned_exam(db, id: str, current_user: dict) -> dict:
+    # Exam (questions only) if the caller is its professor or an admin
+    try:
+        exam = await db.exams.find_one({"_id": ObjectId(id)}, {"professor_id": 1, "questions": 1})
+    except:
+        raise HTTPException(status_code=400, detail="Invalid ID")
+    if not exam:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    if current_user["role"] != "admin" and exam.get("professor_id") != str(current_user["_id"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return exam
+
+@router.get("/assessments/{id}/items")
+async def get_item_analysis(id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    db = await get_database()
+    exam = await get_owned_exam(db, id, current_user)
+
+    async def build():
+        scores, max_marks = await load_score_matrix(db, exam)
+        return item_analysis_report(exam, scores, max_marks)
+
+    # Cached per exam data version (bumped by ingest and exam edits)
+    return await cached_json_response(request, "items", id, {}, exam_scope(id), build)
+
+@router.get("/assessments/{id}/distractors")
+async def get_distractor_analysis(id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    db = await get_database()
+    exam = await get_owned_exam(db, id, current_user)
+    # Overall tallies come from exam_stats; the quartile $group only reruns after a data change
+    return await cached_json_response(
+        request, "distractors", id, {}, exam_scope(id),
+        lambda: build_distractor_report(db, exam)
+    )
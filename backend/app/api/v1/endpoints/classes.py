@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends, Body, BackgroundTasks, Response
 from typing import List
 from app.db.mongodb import get_database
 from app.models.schemas import Class, ClassCreate, ClassJoinRequest, Announcement, AnnouncementCreate
 from app.models.notifications import Notification
 from app.core.security import get_current_user
+from app.core.notifications import start_notification_fanout
+from app.analytics.mastery import load_class_mastery, load_student_mastery
 from bson import ObjectId
 import secrets
 import string
@@ -329,13 +331,46 @@ async def delete_class(class_id: str, current_user: dict = Depends(get_current_u
     # Cleanup related data (students, requests)
     await db.class_students.delete_many({"class_id": class_id})
     await db.class_join_requests.delete_many({"class_id": class_id})
+    await db.mastery_chunks.delete_many({"class_id": class_id})
     
     return {"message": "Class deleted successfully"}
 
+# --- Topic Mastery ---
+
+@router.get("/{class_id}/mastery")
+async def get_class_mastery(class_id: str, current_user: dict = Depends(get_current_user)):
+    # Student x topic heatmap for the class owner
+    db = await get_database()
+    try:
+        c = await db.classes.find_one({"_id": ObjectId(class_id)}, {"professor_id": 1})
+    except:
+        raise HTTPException(status_code=400, detail="Invalid ID")
+    if not c:
+        raise HTTPException(status_code=404, detail="Class not found")
+    if str(c["professor_id"]) != str(current_user["_id"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return await load_class_mastery(db, class_id)
+
+@router.get("/{class_id}/mastery/{student_id}")
+async def get_student_mastery(class_id: str, student_id: str, current_user: dict = Depends(get_current_user)):
+    # Per-topic profile of one student (email); the class owner or the student themselves
+    db = await get_database()
+    try:
+        c = await db.classes.find_one({"_id": ObjectId(class_id)}, {"professor_id": 1})
+    except:
+        raise HTTPException(status_code=400, detail="Invalid ID")
+    if not c:
+        raise HTTPException(status_code=404, detail="Class not found")
+    if str(c["professor_id"]) != str(current_user["_id"]) and current_user.get("email") != student_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return await load_student_mastery(db, class_id, student_id)
+
 # --- Announcements ---
 
 @router.post("/{class_id}/announcements", response_model=Announcement)
-async def create_announcement(class_id: str, announcement: AnnouncementCreate, current_user: dict = Depends(get_current_user)):
+async def create_announcement(class_id: str, announcement: AnnouncementCreate, background_tasks: BackgroundTasks, response: Response, current_user: dict = Depends(get_current_user)):
     db = await get_database()
     try:
         obj_id = ObjectId(class_id)
@@ -362,32 +397,21 @@ async def create_announcement(class_id: str, announcement: AnnouncementCreate, c
     created = await db.announcements.find_one({"_id": res.inserted_id})
     created["_id"] = str(created["_id"])
 
-    # Notify Students
-    # 1. Get all students in class
-    enrollments = await db.class_students.find({"class_id": class_id}).to_list(1000)
-    student_emails = [e["student_id"] for e in enrollments]
-    
-    # We need user_ids ideally, but if not available we rely on email mapping if notifications support it.
-    # Notifications schema uses `recipient_id`.
-    # Let's find user IDs for these emails to be safe, or just use email if system supports it.
-    # Backend `notifications.py` uses `find({"recipient_id": {"$in": user_identifiers}})` where identifiers include email.
-    # So using email as recipient_id should work for our simple system.
-    
-    notifications = []
-    for email in student_emails:
-        notif = {
-            "recipient_id": email,
+    # Notify Students (everyone enrolled), in the background after the response is sent
+    # recipient_id is the student's email; notifications are looked up by email or user id
+    job_id = await start_notification_fanout(
+        background_tasks,
+        "ANNOUNCEMENT",
+        {
             "type": "ANNOUNCEMENT",
             "title": f"Announcement: {c['name']}",
             "message": f"{announcement.title}",
-            "link": f"/student/classes/{class_id}", # Or announcements tab
-            "is_read": False,
-            "created_at": datetime.now(timezone.utc)
-        }
-        notifications.append(notif)
-        
-    if notifications:
-        await db.notifications.insert_many(notifications)
+            "link": f"/student/classes/{class_id}" # Or announcements tab
+        },
+        "class_students", {"class_id": class_id},
+        created_by=str(current_user["_id"])
+    )
+    response.headers["X-Notification-Job"] = job_id
 
     return created
 
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Body
+from typing import Optional
+from app.db.mongodb import get_database
+from app.db.draft_buffer import draft_buffer
+from app.models.schemas import DraftAnswers, DraftAnswersUpdate, StudentResponseCreate
+from app.core.security import get_current_user
+from app.api.v1.endpoints.ingest import ingest_submission, ingest_admission
+from bson import ObjectId
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+router = APIRouter()
+
+# Exam ids known to exist, so autosaves don't each need a lookup
+MAX_KNOWN_EXAMS = 1000
+_known_exams = OrderedDict()
+
+async def require_exam(exam_id: str):
+    if exam_id in _known_exams:
+        _known_exams.move_to_end(exam_id)
+        return
+    if not ObjectId.is_valid(exam_id):
+        raise HTTPException(status_code=400, detail="Invalid ID")
+    db = await get_database()
+    if not await db.exams.find_one({"_id": ObjectId(exam_id)}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Exam not found")
+    _known_exams[exam_id] = True
+    while len(_known_exams) > MAX_KNOWN_EXAMS:
+        _known_exams.popitem(last=False)
+
+def require_student(current_user: dict):
+    if current_user["role"] != "student":
+        raise HTTPException(status_code=403, detail="Only students can save draft answers")
+
+@router.put("/{exam_id}", response_model=DraftAnswers)
+async def save_draft(exam_id: str, draft: DraftAnswersUpdate, current_user: dict = Depends(get_current_user)):
+    require_student(current_user)
+    await require_exam(exam_id)
+    # Memory only; the periodic flush persists the latest version
+    return draft_buffer.put(current_user["email"], exam_id, draft.answers)
+
+@router.get("/{exam_id}", response_model=DraftAnswers)
+async def get_draft(exam_id: str, current_user: dict = Depends(get_current_user)):
+    require_student(current_user)
+    draft = await draft_buffer.get(current_user["email"], exam_id)
+    if not draft:
+        return {"assessment_id": exam_id, "answers": {}}
+    return draft
+
+@router.post("/{exam_id}/submit", status_code=202, dependencies=[Depends(ingest_admission, scope="function")])
+async def submit_draft(
+    exam_id: str,
+    background_tasks: BackgroundTasks,
+    final: Optional[DraftAnswersUpdate] = Body(None),
+    current_user: dict = Depends(get_current_user),
+):
+    require_student(current_user)
+    student_id = current_user["email"]
+
+    # Answers sent with the submit win over the last autosave
+    if final is not None:
+        draft_buffer.put(student_id, exam_id, final.answers)
+    draft = await draft_buffer.get(student_id, exam_id)
+    answers = draft["answers"] if draft else {}
+
+    db = await get_database()
+    try:
+        exam = await db.exams.find_one({"_id": ObjectId(exam_id)}, {"questions.id": 1})
+    except:
+        raise HTTPException(status_code=400, detail="Invalid ID")
+    if not exam:
+        raise HTTPException(status_code=404, detail="Exam not found")
+
+    # One response per question, unanswered ones as empty text (same shape the exam page submits)
+    submitted_at = datetime.now(timezone.utc)
+    responses = [
+        StudentResponseCreate(
+            student_id=student_id,
+            assessment_id=exam_id,
+            question_id=q["id"],
+            response_text=answers.get(q["id"], ""),
+            submitted_at=submitted_at
+        )
+        for q in exam.get("questions", [])
+    ]
+    if not responses:
+        raise HTTPException(status_code=400, detail="Exam has no questions")
+
+    result = await ingest_submission(responses, background_tasks)
+    await draft_buffer.discard(student_id, exam_id)
+    return result
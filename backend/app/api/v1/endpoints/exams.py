@@ -1,11 +1,24 @@
-from fastapi import APIRouter, HTTPException, Body, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Body, Depends, Query, BackgroundTasks, Request, Response
+from typing import List, Optional
 from app.db.mongodb import get_database
-from app.models.exams import Exam, ExamCreate
+from app.db.fanout import fan_out
+from app.core.config import settings
+from app.core.responses import stream_json_array, FastJSONResponse
+from app.core.notifications import start_notification_fanout
+from app.models.exams import Exam, ExamCreate, ExamSummary, EXAM_SUMMARY_PROJECTION
 from app.core.security import get_current_user
 from bson import ObjectId
 from datetime import datetime, timezone
+import base64
+import json
 from app.models.notifications import Notification
+from app.core.cache import (
+    bump_data_version, get_data_version, professor_scope, exam_scope, exam_paper_scope,
+    SingleFlightCache, render_entry, entry_response
+)
+from app.kiro.enrichment import refresh_exam_enrichment
+from app.analytics.topics import tag_questions
+from app.analytics.scorecards import materialize_scorecards, build_scorecard, save_scorecard, scorecard_id, RESULT_FIELDS
 
 router = APIRouter()
 
@@ -18,8 +31,12 @@ def ensure_utc(exam_doc):
         exam_doc["created_at"] = exam_doc["created_at"].replace(tzinfo=timezone.utc)
     return exam_doc
 
-@router.get("/", response_model=List[Exam])
-async def list_exams(professor_id: str = None, current_user: dict = Depends(get_current_user)):
+@router.get("/", response_model=List[ExamSummary])
+async def list_exams(professor_id: str = None, view: str = "summary", current_user: dict = Depends(get_current_user)):
+    # Summaries by default; `view=full` returns whole exams (questions included) to professors/admins
+    if view not in ("summary", "full"):
+        raise HTTPException(status_code=400, detail="view must be 'summary' or 'full'")
+    full = view == "full" and current_user["role"] != "student" # students never load questions
     db = await get_database()
     query = {}
     
@@ -34,27 +51,33 @@ async def list_exams(professor_id: str = None, current_user: dict = Depends(get_
         if professor_id:
              query["professor_id"] = professor_id
         
-    cursor = db.exams.find(query).sort("created_at", -1)
-    exams = await cursor.to_list(length=100)
+    cursor = db.exams.find(query, None if full else EXAM_SUMMARY_PROJECTION).sort("created_at", -1)
     
     # If student, check for attempts
     if current_user["role"] == "student":
         student_id = current_user.get("email") # or _id depending on what is stored in responses
-        exam_ids = [str(e["_id"]) for e in exams]
         
-        # simple check: distinct assessment_ids for this student
-        attempts = await db.student_responses.distinct("assessment_id", {"student_id": student_id, "assessment_id": {"$in": exam_ids}})
-        attempted_set = set(attempts)
+        # The student's submitted exams don't depend on the listing; read both at once
+        reads = await fan_out(
+            "exams.list",
+            exams=lambda: cursor.to_list(length=100),
+            attempts=lambda: db.submissions.distinct("assessment_id", {"student_id": student_id}),
+        )
+        exams = reads["exams"]
+        attempted_set = set(reads["attempts"])
         
         for e in exams:
             e["_id"] = str(e["_id"])
             ensure_utc(e)
             e["attempted"] = e["_id"] in attempted_set
     else:
+        exams = await cursor.to_list(length=100)
         for e in exams:
             e["_id"] = str(e["_id"])
             ensure_utc(e)
-            
+
+    if full:
+        return FastJSONResponse([Exam(**e).model_dump(mode="json", by_alias=True) for e in exams])
     return exams
 
 @router.post("/", response_model=Exam)
@@ -86,11 +109,15 @@ async def create_exam(exam: ExamCreate, current_user: dict = Depends(get_current
         new_exam["is_validated"] = False 
         new_exam["created_at"] = datetime.now(timezone.utc)
         
+        db = await get_database()
+        # Tag each question against the subject syllabus once, at save time
+        await tag_questions(db, new_exam["subject_id"], new_exam.get("questions", []))
+        
         # 4. Insert
         print("Inserting sanitized exam into DB...")
-        db = await get_database()
         result = await db.exams.insert_one(new_exam)
         print(f"Insertion Success! ID: {result.inserted_id}")
+        await bump_data_version(professor_scope(new_exam["professor_id"]))
         
         # 5. Retrieve & Return
         created = await db.exams.find_one({"_id": result.inserted_id})
@@ -106,13 +133,42 @@ async def create_exam(exam: ExamCreate, current_user: dict = Depends(get_current
         # Return 500 but with detail so user sees it
         raise HTTPException(status_code=500, detail=f"Backend Error: {str(e)}")
 
+# Student exam papers: serialized once per exam version without the answers, so the burst of
+# students opening an exam at its start time is served from memory. Keyed by the exam_paper
+# data version, which update/delete/validate bump.
+exam_paper_cache = SingleFlightCache(settings.EXAM_PAPER_CACHE_MAX_ENTRIES)
+
+def student_exam_paper(exam: dict) -> dict:
+    paper = Exam(**exam).model_dump(mode="json", by_alias=True)
+    for q in paper["questions"]:
+        q.pop("correct_answer", None)
+    return paper
+
+async def load_exam_paper(exam_id: str):
+    version = await get_data_version(exam_paper_scope(exam_id))
+
+    async def build():
+        db = await get_database()
+        exam = await db.exams.find_one({"_id": ObjectId(exam_id)})
+        if not exam:
+            raise HTTPException(status_code=404, detail="Exam not found")
+        exam["_id"] = str(exam["_id"])
+        ensure_utc(exam)
+        return render_entry(student_exam_paper(exam))
+
+    return await exam_paper_cache.get_or_build((exam_id, version), build)
+
 @router.get("/{exam_id}", response_model=Exam)
-async def get_exam(exam_id: str):
+async def get_exam(exam_id: str, request: Request, current_user: dict = Depends(get_current_user)):
     db = await get_database()
     try:
         obj_id = ObjectId(exam_id)
     except:
         raise HTTPException(status_code=400, detail="Invalid ID")
+
+    if current_user["role"] == "student":
+        etag, body = await load_exam_paper(exam_id)
+        return entry_response(request, etag, body)
         
     exam = await db.exams.find_one({"_id": obj_id})
     if not exam:
@@ -141,11 +197,21 @@ async def update_exam(exam_id: str, exam: ExamCreate, current_user: dict = Depen
     # Update with new data
     update_data = exam.dict()
     update_data["professor_id"] = str(current_user["_id"])
+    await tag_questions(db, update_data["subject_id"], update_data["questions"])
     
     await db.exams.update_one(
         {"_id": obj_id},
         {"$set": update_data}
     )
+    try:
+        await refresh_exam_enrichment(db, exam_id)
+    except Exception as e:
+        print(f"Misconception enrichment refresh failed for {exam_id}: {e}")
+    if existing_exam.get("results_published"):
+        await materialize_scorecards(db, {**update_data, "_id": obj_id})
+    await bump_data_version(
+        professor_scope(update_data["professor_id"]), exam_scope(exam_id), exam_paper_scope(exam_id)
+    )
     
     updated = await db.exams.find_one({"_id": obj_id})
     updated["_id"] = str(updated["_id"])
@@ -169,6 +235,10 @@ async def delete_exam(exam_id: str, current_user: dict = Depends(get_current_use
          raise HTTPException(status_code=403, detail="Access denied")
 
     await db.exams.delete_one({"_id": obj_id})
+    await db.scorecards.delete_many({"assessment_id": exam_id})
+    await bump_data_version(
+        professor_scope(existing_exam["professor_id"]), exam_scope(exam_id), exam_paper_scope(exam_id)
+    )
     
     return {"message": "Exam deleted successfully"}
 
@@ -192,6 +262,13 @@ async def validate_exam(exam_id: str, is_validated: bool = Body(..., embed=True)
         {"_id": obj_id},
         {"$set": {"is_validated": is_validated}}
     )
+    await bump_data_version(exam_paper_scope(exam_id))
+    if is_validated:
+        # Render the student paper now rather than on the first request at exam start
+        try:
+            await load_exam_paper(exam_id)
+        except Exception as e:
+            print(f"Exam paper pre-render failed for {exam_id}: {e}")
     
     updated = await db.exams.find_one({"_id": obj_id})
     updated["_id"] = str(updated["_id"])
@@ -199,8 +276,17 @@ async def validate_exam(exam_id: str, is_validated: bool = Body(..., embed=True)
     ensure_utc(updated)
     return updated
 
+async def materialize_published_scorecards(exam: dict):
+    # Must not raise: a failure here would also cancel the notification fan-out queued after it
+    try:
+        db = await get_database()
+        count = await materialize_scorecards(db, exam)
+        print(f"Materialized {count} scorecards for exam {exam['_id']}")
+    except Exception as e:
+        print(f"Scorecard materialization failed for exam {exam['_id']}: {e}")
+
 @router.post("/{exam_id}/publish", response_model=Exam)
-async def publish_exam_results(exam_id: str, current_user: dict = Depends(get_current_user)):
+async def publish_exam_results(exam_id: str, background_tasks: BackgroundTasks, response: Response, current_user: dict = Depends(get_current_user)):
     db = await get_database()
     try:
         obj_id = ObjectId(exam_id)
@@ -225,26 +311,24 @@ async def publish_exam_results(exam_id: str, current_user: dict = Depends(get_cu
     updated["_id"] = str(updated["_id"])
     ensure_utc(updated)
 
-    # Notify Students (Who have attempted)
-    # 1. Find all students who submitted responses
-    responses = await db.student_responses.distinct("student_id", {"assessment_id": exam_id})
-    
-    notifications = []
-    for student_id in responses:
-        # Check if notification already exists to avoid spam? No, duplicate publish might be update.
-        notif = {
-            "recipient_id": student_id,
+    # Scorecards in the background, queued ahead of the notifications so students are told once
+    # theirs exist; anyone faster is served by my_result's compute-and-save fallback
+    background_tasks.add_task(materialize_published_scorecards, existing_exam)
+
+    # Notify Students (Who have submitted), in the background after the response is sent
+    job_id = await start_notification_fanout(
+        background_tasks,
+        "RESULT_PUBLISHED",
+        {
             "type": "RESULT_PUBLISHED",
             "title": "Exam Results Released",
             "message": f"Results for '{existing_exam['title']}' have been published. Check your marks now.",
-            "link": f"/student/exams/{exam_id}/result",
-            "is_read": False,
-            "created_at": datetime.now(timezone.utc)
-        }
-        notifications.append(notif)
-    
-    if notifications:
-        await db.notifications.insert_many(notifications)
+            "link": f"/student/exams/{exam_id}/result"
+        },
+        "submissions", {"assessment_id": exam_id},
+        created_by=str(current_user["_id"])
+    )
+    response.headers["X-Notification-Job"] = job_id
     return updated
 
 @router.get("/{exam_id}/students", response_model=List[dict])
@@ -286,8 +370,39 @@ async def get_exam_students(exam_id: str, current_user: dict = Depends(get_curre
         
     return students_list
 
+SCORE_SORTS = {"score_desc": -1, "score_asc": 1}
+
+def encode_score_cursor(row: dict) -> str:
+    payload = {"s": row["score"], "id": row["student_id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_score_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {"score": payload["s"], "student_id": str(payload["id"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def score_keyset_filter(position: dict, direction: int) -> dict:
+    # Rows after `position` in (score, student_id) order, both ascending or both descending
+    op = "$lt" if direction < 0 else "$gt"
+    return {"$or": [
+        {"score": {op: position["score"]}},
+        {"score": position["score"], "student_id": {op: position["student_id"]}}
+    ]}
+
 @router.get("/{exam_id}/students_scores", response_model=List[dict])
-async def get_exam_students_scores(exam_id: str, current_user: dict = Depends(get_current_user)):
+async def get_exam_students_scores(
+    exam_id: str,
+    sort: str = "score_desc",
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    # Table rows sorted by score on the server. With `limit`, one page is returned and the next
+    # page's cursor is in X-Next-Cursor; without it the whole table is streamed.
+    if sort not in SCORE_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SCORE_SORTS)}")
     db = await get_database()
     try:
         obj_id = ObjectId(exam_id)
@@ -295,50 +410,49 @@ async def get_exam_students_scores(exam_id: str, current_user: dict = Depends(ge
         raise HTTPException(status_code=400, detail="Invalid ID")
 
     # Verify ownership
-    existing_exam = await db.exams.find_one({"_id": obj_id})
+    existing_exam = await db.exams.find_one({"_id": obj_id}, {"professor_id": 1, "questions.marks": 1})
     if not existing_exam:
         raise HTTPException(status_code=404, detail="Exam not found")
         
     if existing_exam["professor_id"] != str(current_user["_id"]):
          raise HTTPException(status_code=403, detail="Access denied")
 
-    # Map Question ID to Marks
-    question_marks = {q["id"]: q.get("marks", 1) for q in existing_exam.get("questions", [])}
-    total_marks = sum(question_marks.values())
+    total_marks = sum(q.get("marks", 1) for q in existing_exam.get("questions", []))
 
-    # Get all responses for this exam
-    responses = await db.student_responses.find({"assessment_id": exam_id}).to_list(10000)
-    
-    # Group by student
-    student_scores = {} # student_id -> score
-    
-    for r in responses:
-        sid = r["student_id"]
-        qid = r["question_id"]
-        is_correct = r.get("is_correct", False)
-        
-        if sid not in student_scores:
-            student_scores[sid] = 0
-            
-        if is_correct:
-            student_scores[sid] += question_marks.get(qid, 0)
-    
-    # Format output
-    result_list = []
-    for sid, score in student_scores.items():
+    def score_row(sub):
+        sid = sub["student_id"]
         # Clean ID/Name
         name = sid.split("@")[0] if "@" in sid else sid
-        
-        result_list.append({
+        return {
             "id": sid,
             "name": name, 
             "email": sid,
-            "score": score,
+            "score": sub["score"],
             "total_marks": total_marks,
             "status": "Completed"
-        })
-        
-    return result_list
+        }
+
+    # One summary document per student, written at ingest time; ordered by the
+    # (assessment_id, score, student_id) index
+    direction = SCORE_SORTS[sort]
+    query = {"assessment_id": exam_id}
+    if cursor:
+        query.update(score_keyset_filter(decode_score_cursor(cursor), direction))
+    rows = db.submissions.find(
+        query,
+        {"_id": 0, "student_id": 1, "score": 1},
+        batch_size=min(limit + 1, settings.STREAM_BATCH_SIZE) if limit else settings.STREAM_BATCH_SIZE
+    ).sort([("score", direction), ("student_id", direction)])
+
+    if not limit:
+        return stream_json_array(rows, score_row)
+
+    page = await rows.limit(limit + 1).to_list(limit + 1)
+    headers = {}
+    if len(page) > limit:
+        page = page[:limit]
+        headers["X-Next-Cursor"] = encode_score_cursor(page[-1])
+    return FastJSONResponse([score_row(r) for r in page], headers=headers)
 
 @router.get("/{exam_id}/my_result")
 async def get_my_result(exam_id: str, current_user: dict = Depends(get_current_user)):
@@ -351,8 +465,22 @@ async def get_my_result(exam_id: str, current_user: dict = Depends(get_current_u
     except:
         raise HTTPException(status_code=400, detail="Invalid ID")
 
+    # Precomputed at publish time: one indexed read
+    student_id = current_user["email"]
+    scorecard = await db.scorecards.find_one({"_id": scorecard_id(student_id, exam_id)}, RESULT_FIELDS)
+    if scorecard:
+        return scorecard
+
+    # Not materialized (published before scorecards existed, or not published yet)
+    reads = await fan_out(
+        "exams.my_result",
+        exam=lambda: db.exams.find_one({"_id": obj_id}),
+        responses=lambda: db.student_responses.find({"assessment_id": exam_id, "student_id": student_id}).to_list(1000),
+        submission=lambda: db.submissions.find_one({"assessment_id": exam_id, "student_id": student_id}),
+    )
+
     # Get Exam
-    existing_exam = await db.exams.find_one({"_id": obj_id})
+    existing_exam = reads["exam"]
     if not existing_exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
@@ -360,53 +488,6 @@ async def get_my_result(exam_id: str, current_user: dict = Depends(get_current_u
     if not existing_exam.get("results_published", False):
         raise HTTPException(status_code=403, detail="Results not yet published")
 
-    # Calculate Score
-    student_id = current_user["email"]
-    
-    question_marks = {q["id"]: q.get("marks", 1) for q in existing_exam.get("questions", [])}
-    total_marks = sum(question_marks.values())
-    
-    responses = await db.student_responses.find({
-        "assessment_id": exam_id, 
-        "student_id": student_id
-    }).to_list(1000)
-    
-    score = 0
-    correct_count = 0
-    
-    for r in responses:
-        qid = r["question_id"]
-        is_correct = r.get("is_correct", False)
-        if is_correct:
-            score += question_marks.get(qid, 0)
-            correct_count += 1
-            
-    # Create Response Map
-    response_map = {r["question_id"]: r for r in responses}
-    
-    detailed_questions = []
-    for q in existing_exam.get("questions", []):
-        qid = q["id"]
-        response = response_map.get(qid)
-        
-        q_data = {
-            "id": qid,
-            "text": q["text"],
-            "type": q.get("type", "mcq"),
-            "options": q.get("options", []),
-            "marks": q.get("marks", 1),
-            "correct_answer": q.get("correct_answer"),
-            "user_answer": response.get("response_text") if response else None,
-            "is_correct": response.get("is_correct", False) if response else False,
-            "explanation": q.get("explanation")
-        }
-        detailed_questions.append(q_data)
-            
-    return {
-        "score": score,
-        "total_marks": total_marks,
-        "correct_questions": correct_count,
-        "total_questions": len(existing_exam.get("questions", [])),
-        "responses_count": len(responses),
-        "questions": detailed_questions
-    }
+    scorecard = build_scorecard(existing_exam, student_id, reads["responses"], reads["submission"])
+    await save_scorecard(db, scorecard)
+    return {k: v for k, v in scorecard.items() if k not in RESULT_FIELDS}
@@ -0,0 +1,54 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from typing import Optional
+from app.db.mongodb import get_database
+from app.core.security import get_current_user
+from app.analytics.export import run_export, new_export_id, export_available, FORMATS
+
+router = APIRouter()
+
+# One export at a time per API process; bulk exports belong on scripts/export_analytics.py
+export_lock = asyncio.Lock()
+
+def require_admin(current_user: dict):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can run data exports")
+
+async def run_export_job(export_id: str, fmt: str, institution_id: Optional[str], assessment_id: Optional[str]):
+    async with export_lock:
+        db = await get_database()
+        try:
+            await run_export(db, export_id, fmt, institution_id=institution_id, assessment_id=assessment_id)
+        except Exception:
+            pass # already recorded on the export_jobs document
+
+@router.post("/", status_code=202)
+async def start_export(
+    background_tasks: BackgroundTasks,
+    format: str = "parquet",
+    institution_id: Optional[str] = None,
+    assessment_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    require_admin(current_user)
+    if not export_available():
+        raise HTTPException(status_code=501, detail="Exports need pyarrow installed on the server")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Use one of: {', '.join(FORMATS)}")
+    if export_lock.locked():
+        raise HTTPException(status_code=409, detail="An export is already running")
+
+    export_id = new_export_id()
+    db = await get_database()
+    await db.export_jobs.insert_one({"_id": export_id, "status": "queued", "format": format})
+    background_tasks.add_task(run_export_job, export_id, format, institution_id, assessment_id)
+    return {"export_id": export_id, "status": "queued"}
+
+@router.get("/{export_id}")
+async def get_export(export_id: str, current_user: dict = Depends(get_current_user)):
+    require_admin(current_user)
+    db = await get_database()
+    job = await db.export_jobs.find_one({"_id": export_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
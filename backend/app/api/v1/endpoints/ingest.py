@@ -1,13 +1,117 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import List
+import asyncio
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header
+from fastapi.responses import JSONResponse
+from typing import List, Optional
+from pymongo.errors import DuplicateKeyError
 from app.models.schemas import StudentResponseCreate, StudentResponse
 from app.db.mongodb import get_database
-from app.kiro.job_runner import trigger_analysis_job
+from app.db.write_buffer import response_write_buffer
+from app.db.fanout import query_timings
+from app.analytics.exam_stats import record_submission
+from app.analytics.mastery import record_mastery
+from app.analytics.scorecards import build_scorecard, save_scorecard
+from app.analytics.counters import increment_counters, get_institution_id
+from app.kiro.job_runner import trigger_analysis_job, analysis_limiter
+from app.core.admission import AdmissionController
+from app.core.idempotency import IdempotencyStore
+from app.core.cache import bump_data_version, professor_scope, exam_scope
+from app.core.config import settings
 
 router = APIRouter()
 
-@router.post("/responses", status_code=202)
-async def ingest_responses(responses: List[StudentResponseCreate], background_tasks: BackgroundTasks):
+ingest_admission = AdmissionController(
+    "ingest_responses",
+    max_in_flight=settings.INGEST_MAX_IN_FLIGHT,
+    max_queue=settings.INGEST_MAX_QUEUE,
+    queue_timeout=settings.INGEST_QUEUE_TIMEOUT_SECONDS,
+    retry_after=settings.INGEST_RETRY_AFTER_SECONDS,
+)
+
+ingest_idempotency = IdempotencyStore(
+    "idempotency_keys",
+    lru_size=settings.IDEMPOTENCY_LRU_SIZE,
+    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+)
+
+def build_submission_summary(response_dicts: List[dict], question_marks: dict, professor_id: str) -> dict:
+    # One small document per (student, assessment) that score endpoints can read directly
+    first = response_dicts[0]
+    return {
+        "student_id": first["student_id"],
+        "assessment_id": first["assessment_id"],
+        "professor_id": professor_id,
+        "score": sum(d["marks_awarded"] for d in response_dicts),
+        "total_marks": sum(question_marks.values()),
+        "correct_count": sum(1 for d in response_dicts if d["is_correct"]),
+        "response_count": len(response_dicts),
+        "submitted_at": max(d["submitted_at"] for d in response_dicts),
+    }
+
+@router.get("/metrics")
+async def ingest_metrics():
+    return {
+        "admission": ingest_admission.metrics(),
+        "analysis": analysis_limiter.metrics(),
+        "queries": query_timings.snapshot(),
+    }
+
+@router.post("/responses", status_code=202, dependencies=[Depends(ingest_admission, scope="function")])
+async def ingest_responses(
+    responses: List[StudentResponseCreate],
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    if not responses:
+        raise HTTPException(status_code=400, detail="No responses submitted")
+
+    if not idempotency_key:
+        return await ingest_submission(responses, background_tasks)
+
+    # Scope keys per student so clients cannot collide on each other's keys
+    key = f"ingest:{responses[0].student_id}:{idempotency_key}"
+    replay, resumed = await ingest_idempotency.begin(key)
+    if replay:
+        return JSONResponse(
+            status_code=replay["status_code"],
+            content=replay["body"],
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    async def ingest_once():
+        try:
+            try:
+                result = await ingest_submission(responses, background_tasks)
+            except HTTPException as e:
+                # A taken-over key whose first attempt got (partly) through before its worker died
+                if not resumed or e.status_code != 400:
+                    raise
+                result = await resume_submission(responses, background_tasks, e)
+        except Exception:
+            # Failed requests are not recorded, so the retry runs again
+            await ingest_idempotency.release(key)
+            raise
+        await ingest_idempotency.complete(key, 202, result)
+        return result
+
+    # Shielded: once started, the submission is written and its result recorded even if the
+    # client disconnects, so the retry gets the stored 202 rather than "already submitted"
+    return await asyncio.shield(ingest_once())
+
+async def resume_submission(responses: List[StudentResponseCreate], background_tasks: BackgroundTasks, error: HTTPException) -> dict:
+    db = await get_database()
+    query = {"student_id": responses[0].student_id, "assessment_id": responses[0].assessment_id}
+    submission = await db.submissions.find_one(query, {"_id": 1})
+    if not submission:
+        raise error
+    count = await db.student_responses.count_documents(query)
+    if count == 0:
+        # Claim left without its responses: drop it and ingest again
+        await db.submissions.delete_one({"_id": submission["_id"]})
+        return await ingest_submission(responses, background_tasks)
+    return {"message": f"Ingested {count} responses. Analysis queued."}
+
+async def ingest_submission(responses: List[StudentResponseCreate], background_tasks: BackgroundTasks) -> dict:
     db = await get_database()
     
     # Insert raw responses
@@ -32,9 +136,12 @@ async def ingest_responses(responses: List[StudentResponseCreate], background_ta
         exam = None
         
     correct_answers = {}
+    question_marks = {}
     if exam:
         for q in exam.get("questions", []):
             correct_answers[q["id"]] = q["correct_answer"]
+            question_marks[q["id"]] = q.get("marks", 1)
+    professor_id = str(exam["professor_id"]) if exam else None
 
     response_dicts = []
     for r in responses:
@@ -50,11 +157,56 @@ async def ingest_responses(responses: List[StudentResponseCreate], background_ta
             data["is_correct"] = is_correct
         else:
              data["is_correct"] = False # Default if exam not found
+
+        # Denormalized scoring fields so score endpoints don't re-join against the exam
+        data["max_marks"] = question_marks.get(data["question_id"], 0)
+        data["marks_awarded"] = data["max_marks"] if data["is_correct"] else 0
+        data["professor_id"] = professor_id
              
         data["processed"] = False
         response_dicts.append(data)
 
-    result = await db.student_responses.insert_many(response_dicts)
+    # Claim the (student, assessment) submission first; the unique index rejects concurrent duplicates
+    submission = build_submission_summary(response_dicts, question_marks, professor_id)
+    try:
+        await db.submissions.insert_one(submission)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Exam already submitted. Multiple attempts are not allowed.")
+
+    # Coalesced with concurrent submissions; returns once our rows are acknowledged
+    try:
+        inserted_ids = await response_write_buffer.insert_many(response_dicts)
+    except Exception:
+        # Release the claim so the student can resubmit
+        await db.submissions.delete_one({"_id": submission["_id"]})
+        raise
+
+    # Incremental per-exam counters for dashboards (rebuildable from raw data if this fails)
+    try:
+        await record_submission(db, exam, submission, response_dicts)
+    except Exception as e:
+        print(f"[Ingest] exam_stats update failed for {assessment_id}: {e}")
+
+    # Late submission to an exam whose results are already out: its scorecard is written now
+    if exam and exam.get("results_published"):
+        try:
+            await save_scorecard(db, build_scorecard(exam, student_id, response_dicts, submission))
+        except Exception as e:
+            print(f"[Ingest] scorecard write failed for {assessment_id}: {e}")
+
+    try:
+        await record_mastery(db, exam, student_id, response_dicts)
+    except Exception as e:
+        print(f"[Ingest] mastery update failed for {assessment_id}: {e}")
+
+    try:
+        institution_id = await get_institution_id(db, professor_id)
+        await increment_counters(db, professor_id, institution_id, {"processed_responses": len(response_dicts)})
+    except Exception as e:
+        print(f"[Ingest] counter update failed for {assessment_id}: {e}")
+
+    # Invalidate the professor's and the exam's cached analytics views
+    await bump_data_version(professor_scope(professor_id) if professor_id else None, exam_scope(assessment_id))
     
     # Trigger Analysis in Background (KIRO)
     # Group by assessment/question to optimize batching
@@ -63,4 +215,4 @@ async def ingest_responses(responses: List[StudentResponseCreate], background_ta
     for aid in assessment_ids:
         background_tasks.add_task(trigger_analysis_job, assessment_id=aid)
     
-    return {"message": f"Ingested {len(result.inserted_ids)} responses. Analysis queued."}
+    return {"message": f"Ingested {len(inserted_ids)} responses. Analysis queued."}
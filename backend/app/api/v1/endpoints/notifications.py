@@ -18,6 +18,19 @@ async def list_notifications(current_user: dict = Depends(get_current_user)):
         n["_id"] = str(n["_id"])
     return notifs
 
+@router.get("/jobs/{job_id}")
+async def get_notification_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    # Progress of a background fan-out (publish / announcement) started by the caller
+    db = await get_database()
+    try:
+        job = await db.notification_jobs.find_one({"_id": ObjectId(job_id)})
+    except:
+        raise HTTPException(status_code=400, detail="Invalid ID")
+    if not job or job.get("created_by") != str(current_user["_id"]):
+        raise HTTPException(status_code=404, detail="Notification job not found")
+    job["_id"] = str(job["_id"])
+    return job
+
 @router.put("/read-all")
 async def mark_all_read(current_user: dict = Depends(get_current_user)):
     db = await get_database()
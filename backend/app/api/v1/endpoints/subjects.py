@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, Body, Depends
+from fastapi import APIRouter, HTTPException, Body, Depends, BackgroundTasks
 from typing import List
 from app.db.mongodb import get_database
 from app.models.exams import Subject, SubjectCreate
 from bson import ObjectId
 from app.core.security import get_current_user
+from app.core.cache import bump_data_version, professor_scope
+from app.analytics.topics import retag_subject_exams
+from app.kiro.enrichment import refresh_subject_enrichment
 
 router = APIRouter()
 
@@ -38,7 +41,7 @@ async def create_subject(subject: SubjectCreate, current_user: dict = Depends(ge
     return created_subject
 
 @router.put("/{subject_id}/syllabus", response_model=Subject)
-async def update_syllabus(subject_id: str, syllabus: List[dict] = Body(...), current_user: dict = Depends(get_current_user)):
+async def update_syllabus(subject_id: str, background_tasks: BackgroundTasks, syllabus: List[dict] = Body(...), current_user: dict = Depends(get_current_user)):
     db = await get_database()
     user_id = str(current_user["_id"])
     
@@ -50,11 +53,16 @@ async def update_syllabus(subject_id: str, syllabus: List[dict] = Body(...), cur
     # Ensure ownership
     result = await db.subjects.update_one(
         {"_id": obj_id, "professor_id": user_id},
-        {"$set": {"syllabus": syllabus}}
+        {"$set": {"syllabus": syllabus}, "$inc": {"syllabus_version": 1}}
     )
 
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Subject not found or access denied")
+
+    # New version -> new compiled topic matcher; re-tag this subject's exams in the background
+    background_tasks.add_task(retag_subject_exams, db, subject_id)
+    background_tasks.add_task(refresh_subject_enrichment, db, subject_id)
+    background_tasks.add_task(bump_data_version, professor_scope(user_id))
         
     updated = await db.subjects.find_one({"_id": obj_id})
     updated["_id"] = str(updated["_id"])
@@ -3,6 +3,9 @@ from app.db.mongodb import get_database
 from app.models.schemas import TeacherValidation
 from datetime import datetime, timezone
 from bson import ObjectId
+from app.core.cache import bump_data_version, professor_scope
+from app.analytics.counters import record_status_change
+from app.kiro.enrichment import refresh_enrichment
 
 router = APIRouter()
 
@@ -28,10 +31,24 @@ async def validate_misconception(id: str, payload: dict = Body(...)):
     if action == "rename" and "new_label" in payload:
         update_data["cluster_label"] = payload["new_label"]
         
-    result = await db.misconceptions.update_one({"_id": obj_id}, {"$set": update_data})
+    result = await db.misconceptions.find_one_and_update(
+        {"_id": obj_id},
+        {"$set": update_data},
+        projection={"professor_id": 1, "institution_id": 1, "status": 1}
+    )
     
-    if result.modified_count == 0:
+    if result is None:
         raise HTTPException(status_code=404, detail="Misconception not found")
+
+    await record_status_change(db, result, new_status)
+
+    # A new label changes the stored reasoning/evidence fallback
+    if action == "rename" and "new_label" in payload:
+        renamed = await db.misconceptions.find_one({"_id": obj_id})
+        await refresh_enrichment(db, [renamed])
+
+    if result.get("professor_id"):
+        await bump_data_version(professor_scope(result["professor_id"]))
         
     # Log Validation
     # In real app, get teacher_id from auth token
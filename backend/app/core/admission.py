@@ -0,0 +1,82 @@
+import asyncio
+from fastapi import HTTPException
+
+class AdmissionController:
+    """
+    Bounds concurrent work on a route: at most `max_in_flight` requests run,
+    at most `max_queue` wait for a slot, and a waiter gives up after `queue_timeout` seconds.
+    Rejections are 429 (queue full) or 503 (timed out waiting), both with Retry-After.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+        # Metrics
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_in_flight = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def _reject(self, status_code: int, detail: str):
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def acquire(self):
+        if self._semaphore.locked():
+            if self.queued >= self.max_queue:
+                self.rejected_queue_full += 1
+                self._reject(429, "Server busy, too many pending submissions. Please retry.")
+
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                self._reject(503, "Server busy, submission not accepted in time. Please retry.")
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.admitted += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def __call__(self):
+        # Usable directly as a FastAPI dependency. Declare it with Depends(..., scope="function")
+        # so the slot is released when the handler returns, before any background tasks run
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def metrics(self) -> dict:
+        return {
+            "name": self.name,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_in_flight": self.peak_in_flight,
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from fastapi import Request, Response
+from app.core.config import settings
+from app.core.responses import dumps
+from app.db.mongodb import get_database
+
+# --- Data versions ---
+# A counter per scope (e.g. "professor:<id>") that writers bump whenever data
+# behind a cached view changes. Cached entries are keyed by the version, so a bump
+# invalidates them without any explicit purge.
+
+def professor_scope(professor_id) -> str:
+    return f"professor:{professor_id}"
+
+def exam_scope(exam_id) -> str:
+    return f"exam:{exam_id}"
+
+def exam_paper_scope(exam_id) -> str:
+    # Only the exam document itself (not its submissions), so ingest doesn't invalidate it
+    return f"exam_paper:{exam_id}"
+
+async def get_data_version(scope: str) -> int:
+    db = await get_database()
+    doc = await db.data_versions.find_one({"_id": scope}, {"version": 1})
+    return doc["version"] if doc else 0
+
+async def bump_data_version(*scopes: str):
+    db = await get_database()
+    for scope in scopes:
+        if scope:
+            await db.data_versions.update_one({"_id": scope}, {"$inc": {"version": 1}}, upsert=True)
+
+# --- Response cache ---
+
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> (etag, body, headers)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+class SingleFlightCache(ResponseCache):
+    """A ResponseCache where concurrent misses for the same key share one build."""
+
+    def __init__(self, max_entries: int):
+        super().__init__(max_entries)
+        self._inflight = {} # key -> asyncio.Task
+
+    async def get_or_build(self, key, build: Callable[[], Awaitable]):
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._build(key, build))
+            self._inflight[key] = task
+        # Shielded: a client disconnecting mid-build must not cancel it for everyone else
+        return await asyncio.shield(task)
+
+    async def _build(self, key, build):
+        try:
+            entry = await build()
+            self.set(key, entry)
+            return entry
+        finally:
+            self._inflight.pop(key, None)
+
+def render_entry(data):
+    # (etag, body) for pre-serialized JSON
+    body = dumps(data)
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"', body
+
+def entry_response(request: Request, etag: str, body: bytes, extra_headers: dict = None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", **(extra_headers or {})}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [t.strip() for t in header.split(",")]
+
+async def cached_json_response(
+    request: Request,
+    endpoint: str,
+    user_id: str,
+    params: dict,
+    scope: str,
+    build: Callable[[], Awaitable],
+    with_headers: bool = False,
+) -> Response:
+    """
+    Serves `build()` as JSON through the versioned cache, with a strong ETag.
+    A matching If-None-Match gets an empty 304.
+    With `with_headers`, build returns (data, extra_headers) and the headers are cached too.
+    """
+    version = await get_data_version(scope)
+    key = (endpoint, user_id, tuple(sorted(params.items())), version)
+
+    entry = response_cache.get(key)
+    if entry is None:
+        data, extra_headers = await build() if with_headers else (await build(), {})
+        entry = (*render_entry(data), extra_headers)
+        response_cache.set(key, entry)
+
+    etag, body, extra_headers = entry
+    return entry_response(request, etag, body, extra_headers)
@@ -9,6 +9,57 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ANALYTICS_MODE: str = "demo" # "demo" or "production"
 
+    # Ingest write buffer (group commit of student_responses inserts)
+    RESPONSE_BUFFER_MAX_DOCS: int = 500
+    RESPONSE_BUFFER_MAX_DELAY_MS: int = 20
+
+    # Ingest admission control (backpressure during exam-close spikes)
+    INGEST_MAX_IN_FLIGHT: int = 64
+    INGEST_MAX_QUEUE: int = 256
+    INGEST_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    INGEST_RETRY_AFTER_SECONDS: int = 2
+
+    # Idempotency-Key replay window for retried submissions
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24
+    IDEMPOTENCY_LRU_SIZE: int = 10000
+    # An unfinished claim (e.g. the worker died) can be taken over by a retry after this long
+    IDEMPOTENCY_LEASE_SECONDS: int = 60
+
+    # Autosaved draft answers are coalesced in memory and flushed on this interval
+    DRAFT_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # Versioned analytics response cache (entries per process)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+
+    # Pre-rendered, answer-stripped exam papers served to students (entries per process)
+    EXAM_PAPER_CACHE_MAX_ENTRIES: int = 500
+
+    # Sharded dashboard counters and their periodic reconciliation (0 disables the job)
+    COUNTER_SHARDS: int = 8
+    COUNTER_RECONCILE_INTERVAL_SECONDS: int = 60 * 60
+
+    # Notifications inserted per insert_many by the background fan-out
+    NOTIFICATION_CHUNK_SIZE: int = 500
+
+    # Items per chunk of a streamed JSON array response
+    STREAM_BATCH_SIZE: int = 500
+
+    # Concurrent independent reads per request, and the threshold for logging a slow one
+    QUERY_FANOUT_CONCURRENCY: int = 8
+    SLOW_QUERY_MS: int = 200
+
+    # Student x topic mastery: documents per class the students are hashed into
+    MASTERY_CHUNKS: int = 16
+
+    # Columnar analytics export (needs pyarrow); rows per row group and Mongo cursor batch size
+    EXPORT_DIR: str = "exports"
+    EXPORT_ROW_GROUP_SIZE: int = 50000
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # KIRO background analysis runs beside ingest, capped so it cannot starve submissions
+    ANALYSIS_MAX_CONCURRENCY: int = 4
+    ANALYSIS_MAX_QUEUE: int = 100
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,100 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+from app.db.mongodb import get_database
+
+class IdempotencyStore:
+    """
+    Remembers the response of a completed request under its Idempotency-Key.
+    Keys live in a TTL-indexed Mongo collection (shared across workers) with an
+    in-process LRU in front, so a replay is answered without touching the handler.
+    An in-progress claim is a lease: if its holder never completes or releases it,
+    a retry takes it over once `lease_seconds` have passed.
+    """
+
+    def __init__(self, collection_name: str, lru_size: int, lease_seconds: int, ttl_seconds: int):
+        self.collection_name = collection_name
+        self.lru_size = lru_size
+        self.lease_seconds = lease_seconds
+        self.ttl_seconds = ttl_seconds
+        self._lru = OrderedDict() # key -> (record, expires_at)
+
+    def _remember(self, key: str, record: dict):
+        self._lru[key] = (record, time.monotonic() + self.ttl_seconds)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[dict]:
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._lru[key] # past the replay window, same as the Mongo TTL
+            return None
+        self._lru.move_to_end(key)
+        return entry[0]
+
+    async def begin(self, key: str) -> Tuple[Optional[dict], bool]:
+        """
+        Returns (stored response, False) for a replay, or claims the key and returns
+        (None, resumed), where `resumed` means an abandoned claim was taken over.
+        """
+        record = self._recall(key)
+        if record is not None:
+            return record, False
+
+        db = await get_database()
+        now = datetime.now(timezone.utc)
+        locked_until = now + timedelta(seconds=self.lease_seconds)
+        try:
+            await db[self.collection_name].insert_one({
+                "_id": key,
+                "status": "in_progress",
+                "locked_until": locked_until,
+                "created_at": now
+            })
+            return None, False
+        except DuplicateKeyError:
+            pass
+
+        # Take over an abandoned claim whose lease has run out
+        taken = await db[self.collection_name].find_one_and_update(
+            {
+                "_id": key,
+                "status": "in_progress",
+                "$or": [{"locked_until": {"$lt": now}}, {"locked_until": {"$exists": False}}]
+            },
+            {"$set": {"locked_until": locked_until}}
+        )
+        if taken:
+            return None, True
+
+        existing = await db[self.collection_name].find_one({"_id": key})
+        if existing and existing["status"] == "completed":
+            record = {"status_code": existing["status_code"], "body": existing["body"]}
+            self._remember(key, record)
+            return record, False
+
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed.",
+            headers={"Retry-After": "1"},
+        )
+
+    async def complete(self, key: str, status_code: int, body: dict):
+        record = {"status_code": status_code, "body": body}
+        db = await get_database()
+        await db[self.collection_name].update_one(
+            {"_id": key},
+            {"$set": {"status": "completed", **record}, "$unset": {"locked_until": ""}}
+        )
+        self._remember(key, record)
+
+    async def release(self, key: str):
+        # Failed requests are not recorded, so a retry runs again
+        db = await get_database()
+        await db[self.collection_name].delete_one({"_id": key, "status": "in_progress"})
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from typing import Optional
+from bson import ObjectId
+from fastapi import BackgroundTasks
+from app.core.config import settings
+from app.db.mongodb import get_database
+
+# Background fan-out of one notification to many recipients.
+# The endpoint records a job in `notification_jobs` and returns; the worker streams the
+# recipients from a cursor and inserts notifications in fixed-size unordered chunks,
+# updating the job's `sent` count after each chunk.
+
+async def start_notification_fanout(
+    background_tasks: BackgroundTasks,
+    kind: str,
+    template: dict,
+    source: str,
+    query: dict,
+    field: str = "student_id",
+    created_by: Optional[str] = None,
+) -> str:
+    """
+    Queues `template` (type, title, message, link) for every `field` value in
+    `db[source].find(query)`. Returns the job id.
+    """
+    db = await get_database()
+    job = {
+        "kind": kind,
+        "status": "queued",
+        "sent": 0,
+        "created_by": created_by,
+        "created_at": datetime.now(timezone.utc)
+    }
+    res = await db.notification_jobs.insert_one(job)
+    job_id = str(res.inserted_id)
+    background_tasks.add_task(run_notification_fanout, job_id, template, source, query, field)
+    return job_id
+
+async def run_notification_fanout(job_id: str, template: dict, source: str, query: dict, field: str):
+    db = await get_database()
+    job_filter = {"_id": ObjectId(job_id)}
+    chunk_size = settings.NOTIFICATION_CHUNK_SIZE
+    await db.notification_jobs.update_one(job_filter, {"$set": {"status": "running", "started_at": datetime.now(timezone.utc)}})
+
+    async def send(chunk):
+        await db.notifications.insert_many(chunk, ordered=False)
+        await db.notification_jobs.update_one(job_filter, {"$inc": {"sent": len(chunk)}})
+
+    try:
+        chunk = []
+        cursor = db[source].find(query, {"_id": 0, field: 1}, batch_size=chunk_size)
+        async for doc in cursor:
+            if not doc.get(field):
+                continue
+            chunk.append({
+                **template,
+                "recipient_id": doc[field],
+                "is_read": False,
+                "created_at": datetime.now(timezone.utc)
+            })
+            if len(chunk) >= chunk_size:
+                await send(chunk)
+                chunk = []
+        if chunk:
+            await send(chunk)
+    except Exception as e:
+        print(f"[Notifications] fan-out {job_id} failed: {e}")
+        await db.notification_jobs.update_one(
+            job_filter,
+            {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.now(timezone.utc)}}
+        )
+        return
+
+    await db.notification_jobs.update_one(
+        job_filter, {"$set": {"status": "completed", "finished_at": datetime.now(timezone.utc)}}
+    )
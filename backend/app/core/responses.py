@@ -0,0 +1,66 @@
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterable, Callable, Optional
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.core.config import settings
+
+# JSON encoding for API responses. orjson serializes dicts, lists and datetimes natively
+# (same ISO format as the stdlib path); ObjectId and anything else unusual goes through
+# `_default`. Falls back to the stdlib encoder when orjson isn't installed.
+
+try:
+    import orjson
+except ImportError: # optional speedup: pip install orjson
+    orjson = None
+
+def _default(obj: Any):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    # Pydantic models, sets, Decimals, ...
+    return jsonable_encoder(obj, custom_encoder={ObjectId: str})
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """Default response class of the app (see main.py)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+async def _json_array(items: AsyncIterable, transform: Optional[Callable], batch_size: int):
+    # "[" + comma-separated items + "]", one chunk per batch of items
+    yield b"["
+    first = True
+    batch = []
+    async for item in items:
+        batch.append(dumps(transform(item) if transform else item))
+        if len(batch) >= batch_size:
+            yield (b"" if first else b",") + b",".join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b"]"
+
+def stream_json_array(
+    items: AsyncIterable,
+    transform: Optional[Callable] = None,
+    batch_size: Optional[int] = None,
+    headers: Optional[dict] = None,
+) -> StreamingResponse:
+    """
+    Streams an async iterable (e.g. a Motor cursor) as a JSON array, serializing each
+    batch as it arrives so the full list is never held in memory.
+    """
+    return StreamingResponse(
+        _json_array(items, transform, batch_size or settings.STREAM_BATCH_SIZE),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.db.mongodb import get_database
+
+class DraftBuffer:
+    """
+    Coalescing buffer for in-progress exam answers.
+    Only the latest draft per (student, exam) is kept in memory; a periodic flush
+    upserts every dirty draft with one bulk_write, so rapid autosaves cost one write per interval.
+    """
+
+    def __init__(self, collection_name: str, flush_interval: float):
+        self.collection_name = collection_name
+        self.flush_interval = flush_interval
+        self._dirty = {} # draft _id -> draft doc
+        self._flushing = None # (draft _id -> draft doc, done event) of the bulk_write in progress
+        self._task = None
+
+    @staticmethod
+    def draft_id(student_id: str, exam_id: str) -> str:
+        return f"{student_id}:{exam_id}"
+
+    def put(self, student_id: str, exam_id: str, answers: dict) -> dict:
+        draft = {
+            "_id": self.draft_id(student_id, exam_id),
+            "student_id": student_id,
+            "assessment_id": exam_id,
+            "answers": answers,
+            "updated_at": datetime.now(timezone.utc)
+        }
+        self._dirty[draft["_id"]] = draft
+        return draft
+
+    async def get(self, student_id: str, exam_id: str) -> Optional[dict]:
+        key = self.draft_id(student_id, exam_id)
+        if key in self._dirty:
+            return self._dirty[key]
+        # Moved out of _dirty but maybe not in Mongo yet
+        if self._flushing and key in self._flushing[0]:
+            return self._flushing[0][key]
+        db = await get_database()
+        return await db[self.collection_name].find_one({"_id": key})
+
+    async def discard(self, student_id: str, exam_id: str):
+        key = self.draft_id(student_id, exam_id)
+        self._dirty.pop(key, None)
+        # An upsert of this draft may be in flight; let it land first so the delete wins
+        while self._flushing and key in self._flushing[0]:
+            await self._flushing[1].wait()
+            self._dirty.pop(key, None) # a failed flush puts its batch back
+        db = await get_database()
+        await db[self.collection_name].delete_one({"_id": key})
+
+    async def flush(self):
+        # One flush at a time, so discard() only has to wait for the current one
+        while self._flushing:
+            await self._flushing[1].wait()
+        if not self._dirty:
+            return
+        batch = self._dirty
+        self._dirty = {}
+        done = asyncio.Event()
+        self._flushing = (batch, done)
+
+        try:
+            db = await get_database()
+            await db[self.collection_name].bulk_write(
+                [UpdateOne({"_id": key}, {"$set": draft}, upsert=True) for key, draft in batch.items()],
+                ordered=False
+            )
+        except Exception as e:
+            print(f"[Drafts] Flush failed, retrying next interval: {e}")
+            # Keep anything that was not overwritten by a newer save in the meantime
+            for key, draft in batch.items():
+                self._dirty.setdefault(key, draft)
+        finally:
+            self._flushing = None
+            done.set()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+draft_buffer = DraftBuffer("response_drafts", flush_interval=settings.DRAFT_FLUSH_INTERVAL_SECONDS)
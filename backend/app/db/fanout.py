@@ -0,0 +1,57 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from app.core.config import settings
+
+# Runs an endpoint's independent Mongo reads concurrently instead of one after another,
+# so the request waits for the slowest read rather than the sum of all of them.
+#
+#   results = await fan_out("exams.my_result",
+#       exam=lambda: db.exams.find_one(...),
+#       submission=lambda: db.submissions.find_one(...),
+#   )
+#
+# Reads are passed as zero-arg callables: Motor starts a query as soon as find_one()/to_list()
+# is called, so each one is only created once it holds a concurrency slot. Each read is timed
+# from that point; per-(endpoint, query) totals are kept for /ingest/metrics and reads slower
+# than SLOW_QUERY_MS are logged.
+
+class QueryTimings:
+    def __init__(self):
+        self._stats = {} # "label.name" -> {"count", "total_ms", "max_ms"}
+
+    def record(self, key: str, elapsed_ms: float):
+        stats = self._stats.setdefault(key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def snapshot(self) -> dict:
+        return {
+            key: {
+                "count": s["count"],
+                "avg_ms": round(s["total_ms"] / s["count"], 2),
+                "max_ms": round(s["max_ms"], 2),
+            }
+            for key, s in sorted(self._stats.items())
+        }
+
+query_timings = QueryTimings()
+
+async def _timed(key: str, query: Callable[[], Awaitable], limit: asyncio.Semaphore):
+    async with limit:
+        start = time.perf_counter()
+        try:
+            return await query()
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            query_timings.record(key, elapsed_ms)
+            if elapsed_ms > settings.SLOW_QUERY_MS:
+                print(f"[Query] slow {key}: {elapsed_ms:.0f}ms")
+
+async def fan_out(label: str, max_concurrency: Optional[int] = None, **queries: Callable[[], Awaitable]) -> Dict[str, object]:
+    """Runs the named reads concurrently (at most `max_concurrency` at once) and returns {name: result}."""
+    limit = asyncio.Semaphore(max_concurrency or settings.QUERY_FANOUT_CONCURRENCY)
+    names = list(queries)
+    results = await asyncio.gather(*(_timed(f"{label}.{name}", queries[name], limit) for name in names))
+    return dict(zip(names, results))
@@ -0,0 +1,45 @@
+from pymongo import ASCENDING
+from app.db.mongodb import get_database
+from app.core.config import settings
+
+async def ensure_indexes():
+    db = await get_database()
+
+    # Raw responses: per-exam scans and the per-student "already submitted" check
+    await db.student_responses.create_index([("assessment_id", ASCENDING), ("student_id", ASCENDING)])
+
+    # One submission summary per (student, exam); also guards against double submits
+    await db.submissions.create_index(
+        [("student_id", ASCENDING), ("assessment_id", ASCENDING)], unique=True
+    )
+    # Score tables: sorted by score, ties (and keyset pages) by student
+    await db.submissions.create_index(
+        [("assessment_id", ASCENDING), ("score", ASCENDING), ("student_id", ASCENDING)]
+    )
+
+    # Professor-scoped exam listings
+    await db.exams.create_index([("professor_id", ASCENDING), ("created_at", ASCENDING)])
+
+    # Owner-scoped misconception reads
+    await db.misconceptions.create_index(
+        [("professor_id", ASCENDING), ("status", ASCENDING), ("assessment_id", ASCENDING)]
+    )
+    await db.misconceptions.create_index([("institution_id", ASCENDING), ("status", ASCENDING)])
+    # Per-exam reads (analytics export)
+    await db.misconceptions.create_index("assessment_id")
+
+    # Scorecards are read by _id; dropped per exam
+    await db.scorecards.create_index("assessment_id")
+
+    # Class mastery chunks are read per class
+    await db.mastery_chunks.create_index("class_id")
+
+    # Dashboard counter shards are read per scope
+    await db.counters.create_index("scope")
+
+    # Stored Idempotency-Key responses expire after the replay window
+    await db.idempotency_keys.create_index(
+        "created_at", expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS
+    )
+
+    print("MongoDB indexes ensured")
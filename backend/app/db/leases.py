@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta, timezone
+from pymongo.errors import DuplicateKeyError
+
+# Time-based leases in the `job_leases` collection, so a periodic job started in every
+# API worker runs in only one of them per interval.
+
+async def acquire_lease(db, name: str, seconds: float) -> bool:
+    """True if this caller now holds `name` for `seconds`; False if another holder's lease is live."""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.job_leases.update_one(
+            {"_id": name, "locked_until": {"$lt": now}},
+            {"$set": {"locked_until": now + timedelta(seconds=seconds), "acquired_at": now}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # The lease exists and has not expired, so the upsert tried to insert a second document
+        return False
@@ -0,0 +1,95 @@
+import asyncio
+from typing import List
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.db.mongodb import get_database
+
+class WriteBuffer:
+    """
+    Group-commit buffer for inserts into a single collection.
+    Concurrent callers are coalesced into one insert_many, flushed when
+    `max_docs` are pending or `max_delay_ms` has passed since the first one.
+    Each caller's await returns only after the batch holding its rows is acknowledged.
+    """
+
+    def __init__(self, collection_name: str, max_docs: int, max_delay_ms: int):
+        self.collection_name = collection_name
+        self.max_docs = max_docs
+        self.max_delay = max_delay_ms / 1000
+        self._pending = [] # [(docs, future)]
+        self._pending_count = 0
+        self._timer = None
+        self._inflight = set()
+
+    async def insert_many(self, docs: List[dict]) -> list:
+        if not docs:
+            return []
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((docs, future))
+        self._pending_count += len(docs)
+
+        if self._pending_count >= self.max_docs:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+        self._pending_count = 0
+
+        task = asyncio.create_task(self._write(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _write(self, batch):
+        combined = [d for docs, _ in batch for d in docs]
+        try:
+            db = await get_database()
+            # ordered=False so one caller's bad row does not stop the rest of the batch
+            await db[self.collection_name].insert_many(combined, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"] for err in e.details.get("writeErrors", [])}
+            self._resolve(batch, failed, e)
+            return
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._resolve(batch, set(), None)
+
+    def _resolve(self, batch, failed_indexes, error):
+        # insert_many assigns _id on each doc in place, so ids can be read back per caller
+        offset = 0
+        for docs, future in batch:
+            indexes = range(offset, offset + len(docs))
+            offset += len(docs)
+            if future.done():
+                continue
+            if failed_indexes.intersection(indexes):
+                future.set_exception(error)
+            else:
+                future.set_result([d["_id"] for d in docs])
+
+    async def close(self):
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+response_write_buffer = WriteBuffer(
+    "student_responses",
+    max_docs=settings.RESPONSE_BUFFER_MAX_DOCS,
+    max_delay_ms=settings.RESPONSE_BUFFER_MAX_DELAY_MS,
+)
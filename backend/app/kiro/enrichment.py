@@ -0,0 +1,116 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.analytics.topics import question_topic
+
+# Display fields for a misconception, computed when KIRO creates the cluster and stored on it:
+#   question_text, options, incorrect_answer, reasoning, concept_chain, topic_name, evidence
+# `enrichment_key` hashes the inputs (label, count, question, tags), so a refresh only
+# rewrites documents whose source actually changed. Read endpoints just project these fields.
+
+MAX_EVIDENCE = 5
+
+def incorrect_answer_from_label(label: str) -> str:
+    # Cluster labels quote the seed answer: "Misconception similar to: '<answer>'"
+    if label and "'" in label:
+        return label.split("'")[1]
+    return "an incorrect option"
+
+def enrichment_key(misconception: dict, exam: Optional[dict], question: Optional[dict]) -> str:
+    source = {
+        "label": misconception.get("cluster_label", ""),
+        "count": misconception.get("student_count", 0),
+        "subject": (exam or {}).get("subject_id"),
+        "question": [question.get(k) for k in ("text", "options", "topic_id", "topic_name", "unit")] if question else None,
+    }
+    return hashlib.sha1(json.dumps(source, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def build_enrichment(misconception: dict, exam: Optional[dict], question: Optional[dict], evidence: List[str]) -> dict:
+    incorrect_answer = incorrect_answer_from_label(misconception.get("cluster_label", ""))
+    count = misconception.get("student_count", 0)
+    tags = question_topic(question)
+    return {
+        "question_text": question.get("text", "Question text not found") if question else "Unknown Question",
+        "options": question.get("options", []) if question else [],
+        "incorrect_answer": incorrect_answer,
+        "reasoning": (
+            f"The AI detected that {count} students selected '{incorrect_answer}'. "
+            f"This systematic pattern suggests a confusion between the correct concept and '{incorrect_answer}', "
+            "likely due to misinterpreting the question context."
+        ),
+        "concept_chain": [(exam or {}).get("subject_id", "General"), tags["unit"], tags["topic_name"]],
+        "topic_name": tags["topic_name"],
+        # Fallback if no specific examples (shouldn't happen with valid clusters)
+        "evidence": evidence[:MAX_EVIDENCE] or [incorrect_answer] * min(3, count),
+        "enrichment_key": enrichment_key(misconception, exam, question),
+        "enriched_at": datetime.utcnow(),
+    }
+
+async def load_exam(db, assessment_id) -> Optional[dict]:
+    if not ObjectId.is_valid(str(assessment_id)):
+        return None
+    return await db.exams.find_one({"_id": ObjectId(str(assessment_id))}, {"subject_id": 1, "questions": 1})
+
+def find_question(exam: Optional[dict], question_id) -> Optional[dict]:
+    for q in (exam or {}).get("questions", []):
+        if str(q.get("id")) == str(question_id):
+            return q
+    return None
+
+def enrich_new_misconceptions(exam: Optional[dict], misconceptions: List[dict], response_texts: Dict[str, str]):
+    # At cluster creation the example responses are already in memory: no extra query
+    for m in misconceptions:
+        evidence = [response_texts[eid] for eid in m.get("example_ids", []) if eid in response_texts]
+        m.update(build_enrichment(m, exam, find_question(exam, m.get("question_id")), evidence))
+    return misconceptions
+
+async def fetch_evidence(db, misconceptions: List[dict]) -> Dict[str, str]:
+    ids = [ObjectId(eid) for m in misconceptions for eid in m.get("example_ids", []) if ObjectId.is_valid(str(eid))]
+    if not ids:
+        return {}
+    cursor = db.student_responses.find({"_id": {"$in": ids}}, {"response_text": 1})
+    return {str(r["_id"]): r.get("response_text", "") async for r in cursor}
+
+async def refresh_enrichment(db, misconceptions: List[dict], exams: Optional[Dict[str, dict]] = None) -> int:
+    """
+    Re-enriches the given misconception documents (in place) whose source changed or that were
+    never enriched, and persists the new fields. Stored evidence is kept; it is only looked up
+    for documents that have none.
+    """
+    exams = dict(exams or {})
+    stale = []
+    for m in misconceptions:
+        aid = str(m.get("assessment_id"))
+        if aid not in exams:
+            exams[aid] = await load_exam(db, aid)
+        exam = exams[aid]
+        question = find_question(exam, m.get("question_id"))
+        if m.get("enriched_at") is None or m.get("enrichment_key") != enrichment_key(m, exam, question):
+            stale.append((m, exam, question))
+    if not stale:
+        return 0
+
+    response_texts = await fetch_evidence(db, [m for m, _, _ in stale if not m.get("evidence")])
+    ops = []
+    for m, exam, question in stale:
+        evidence = m.get("evidence") or [response_texts[eid] for eid in m.get("example_ids", []) if eid in response_texts]
+        fields = build_enrichment(m, exam, question, evidence)
+        m.update(fields)
+        ops.append(UpdateOne({"_id": m["_id"]}, {"$set": fields}))
+    await db.misconceptions.bulk_write(ops, ordered=False)
+    return len(ops)
+
+async def refresh_exam_enrichment(db, assessment_id: str) -> int:
+    # After an exam edit (question text/options/topics)
+    misconceptions = await db.misconceptions.find({"assessment_id": str(assessment_id)}).to_list(None)
+    return await refresh_enrichment(db, misconceptions)
+
+async def refresh_subject_enrichment(db, subject_id: str) -> int:
+    # After a syllabus change re-tagged the subject's exams
+    count = 0
+    async for exam in db.exams.find({"subject_id": str(subject_id)}, {"_id": 1}):
+        count += await refresh_exam_enrichment(db, str(exam["_id"]))
+    return count
@@ -1,10 +1,78 @@
 import asyncio
 from app.db.mongodb import get_database
 from app.kiro.analyzers.clustering import cluster_responses
-from app.models.schemas import StudentResponse, DetectedMisconception
+from app.kiro.enrichment import load_exam, enrich_new_misconceptions
+from app.models.schemas import StudentResponse, DetectedMisconception, MisconceptionStatus
+from app.core.admission import AdmissionController
+from app.core.config import settings
+from app.core.cache import bump_data_version, professor_scope
+from app.analytics.counters import increment_counters, status_field
+from fastapi import HTTPException
+from bson import ObjectId
 from datetime import datetime
 
+# Background analysis gets its own bounded pool so a burst of jobs queues here
+# instead of competing with ingest for the event loop and Mongo connections.
+analysis_limiter = AdmissionController(
+    "kiro_analysis",
+    max_in_flight=settings.ANALYSIS_MAX_CONCURRENCY,
+    max_queue=settings.ANALYSIS_MAX_QUEUE,
+    queue_timeout=None,
+    retry_after=0,
+)
+_queued_assessments = set()
+# Assessments whose job found the queue full; re-queued one at a time as running jobs finish
+_deferred_assessments = set()
+_requeued = set() # strong refs to re-queued tasks
+
+def requeue_deferred():
+    if not _deferred_assessments:
+        return
+    assessment_id = _deferred_assessments.pop()
+    task = asyncio.create_task(trigger_analysis_job(assessment_id))
+    _requeued.add(task)
+    task.add_done_callback(_requeued.discard)
+
 async def trigger_analysis_job(assessment_id: str):
+    # A job already waiting for this assessment will pick up the new responses too
+    if assessment_id in _queued_assessments:
+        print(f"[KIRO] Analysis already queued for assessment: {assessment_id}")
+        return
+
+    _queued_assessments.add(assessment_id)
+    try:
+        await analysis_limiter.acquire()
+    except HTTPException:
+        _deferred_assessments.add(assessment_id)
+        print(f"[KIRO] Analysis queue full, deferred assessment: {assessment_id} ({len(_deferred_assessments)} deferred)")
+        return
+    finally:
+        _queued_assessments.discard(assessment_id)
+
+    try:
+        await run_analysis_job(assessment_id)
+    finally:
+        analysis_limiter.release()
+        requeue_deferred()
+
+async def get_owner_fields(db, assessment_id: str) -> dict:
+    # professor_id / institution_id of the exam, denormalized onto misconceptions
+    owner = {"professor_id": None, "institution_id": None}
+    if not ObjectId.is_valid(assessment_id):
+        return owner
+
+    exam = await db.exams.find_one({"_id": ObjectId(assessment_id)}, {"professor_id": 1})
+    if not exam:
+        return owner
+    owner["professor_id"] = str(exam["professor_id"])
+
+    if ObjectId.is_valid(owner["professor_id"]):
+        professor = await db.users.find_one({"_id": ObjectId(owner["professor_id"])}, {"institution_id": 1})
+        if professor:
+            owner["institution_id"] = professor.get("institution_id")
+    return owner
+
+async def run_analysis_job(assessment_id: str):
     print(f"[KIRO] Starting analysis for assessment: {assessment_id}")
     db = await get_database()
     
@@ -40,13 +108,25 @@ async def trigger_analysis_job(assessment_id: str):
         
     # 4. Save to DB
     if new_misconceptions:
+        # Owner fields let read endpoints query only the caller's rows
+        owner = await get_owner_fields(db, assessment_id)
+        # Display fields (reasoning, concept chain, evidence) are stored now, not rebuilt per read
+        exam = await load_exam(db, assessment_id)
+        response_texts = {str(r.id): r.response_text for r in responses_models}
+        enrich_new_misconceptions(exam, new_misconceptions, response_texts)
         # Add timestamps
         for m in new_misconceptions:
+            m.update(owner)
             m["created_at"] = datetime.utcnow()
             m["last_updated"] = datetime.utcnow()
             
         await db.misconceptions.insert_many(new_misconceptions)
         print(f"[KIRO] Saved {len(new_misconceptions)} new misconceptions.")
+        await increment_counters(db, owner["professor_id"], owner["institution_id"], {
+            status_field(MisconceptionStatus.PENDING): len(new_misconceptions)
+        })
+        if owner["professor_id"]:
+            await bump_data_version(professor_scope(owner["professor_id"]))
         
     # 5. Mark responses as processed
     response_ids = [r.id for r in responses_models]
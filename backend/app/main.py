@@ -2,6 +2,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.db.write_buffer import response_write_buffer
+from app.db.indexes import ensure_indexes
+from app.db.draft_buffer import draft_buffer
+from app.db.mongodb import get_database
+from app.analytics.counters import run_reconciliation
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+import asyncio
 
 app = FastAPI(
     title="CONCEPTLENS API",
@@ -9,6 +17,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
 )
 
 
@@ -35,17 +44,31 @@ class ForceCORSMiddleware(BaseHTTPMiddleware):
         response.headers["Access-Control-Allow-Credentials"] = "true"
         response.headers["Access-Control-Allow-Methods"] = "*"
         response.headers["Access-Control-Allow-Headers"] = "*"
+        response.headers["Access-Control-Expose-Headers"] = "ETag, X-Next-Cursor, Retry-After, X-Notification-Job"
         return response
 
 app.add_middleware(ForceCORSMiddleware)
 
 
+background_jobs = []
+
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo()
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        print(f"Index creation failed: {e}")
+    draft_buffer.start()
+    if settings.COUNTER_RECONCILE_INTERVAL_SECONDS > 0:
+        background_jobs.append(asyncio.create_task(run_reconciliation(get_database)))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for job in background_jobs:
+        job.cancel()
+    await draft_buffer.close()
+    await response_write_buffer.close()
     await close_mongo_connection()
 
 app.include_router(api_router, prefix="/api/v1")
@@ -9,6 +9,9 @@ class Question(BaseModel):
     options: List[str] = []
     correct_answer: str
     topic_id: str
+    topic_name: Optional[str] = None # Set from the subject syllabus when the exam is saved
+    unit: Optional[str] = None
+    auto_tagged: bool = False # Topic tags came from the syllabus, not the professor
     marks: int = 1
 
 class ExamCreate(BaseModel):
@@ -40,6 +43,34 @@ class Exam(BaseModel):
 
     attempted: Optional[bool] = False # Dynamic field for student view
 
+class ExamSummary(BaseModel):
+    # List views: no questions, just their count and total marks
+    id: str = Field(alias="_id")
+    title: str
+    subject_id: str
+    professor_id: str
+    duration_minutes: int
+    schedule_start: datetime
+    exam_access_end_time: Optional[datetime] = None
+    anti_cheat_config: dict = {"fullscreen": True, "tab_switch": True}
+    class_ids: List[str] = []
+    created_at: Optional[datetime] = None
+    is_validated: bool = False
+    results_published: bool = False
+    question_count: int = 0
+    total_marks: float = 0
+
+    attempted: Optional[bool] = False # Dynamic field for student view
+
+# Mongo projection that builds an ExamSummary server-side (questions never leave the database)
+EXAM_SUMMARY_PROJECTION = {
+    "title": 1, "subject_id": 1, "professor_id": 1, "duration_minutes": 1, "schedule_start": 1,
+    "exam_access_end_time": 1, "anti_cheat_config": 1, "class_ids": 1, "created_at": 1,
+    "is_validated": 1, "results_published": 1,
+    "question_count": {"$size": {"$ifNull": ["$questions", []]}},
+    "total_marks": {"$sum": {"$map": {"input": {"$ifNull": ["$questions", []]}, "in": {"$ifNull": ["$$this.marks", 1]}}}},
+}
+
 class SubjectCreate(BaseModel):
     name: str
     syllabus: List[dict] = [] # [{unit: "1", topics: [...]}]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Dict
 from pydantic import BaseModel, EmailStr, Field
 from bson import ObjectId
 
@@ -143,6 +143,14 @@ class StudentResponse(StudentResponseCreate):
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
 
+# --- Draft Answer Models (autosave during an exam) ---
+class DraftAnswersUpdate(BaseModel):
+    answers: Dict[str, str] = {} # question_id -> response_text
+
+class DraftAnswers(DraftAnswersUpdate):
+    assessment_id: str
+    updated_at: Optional[datetime] = None
+
 # --- Misconception Models (for Analytics) ---
 class MisconceptionStatus: 
     PENDING = "pending"
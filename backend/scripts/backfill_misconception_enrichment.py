@@ -0,0 +1,31 @@
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.kiro.enrichment import refresh_exam_enrichment
+
+# Stores reasoning / concept chain / evidence on misconceptions created before KIRO did,
+# and refreshes any whose question or label changed since.
+async def backfill():
+    await connect_to_mongo()
+    db = await get_database()
+
+    assessment_ids = await db.misconceptions.distinct("assessment_id")
+    updated = 0
+    for aid in assessment_ids:
+        updated += await refresh_exam_enrichment(db, aid)
+    print(f"Enriched {updated} misconceptions across {len(assessment_ids)} exams")
+
+    await close_mongo_connection()
+
+if __name__ == "__main__":
+    try:
+        if sys.platform == 'win32':
+             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(backfill())
+    except Exception as e:
+        print(e)
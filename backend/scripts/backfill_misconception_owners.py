@@ -0,0 +1,40 @@
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.db.indexes import ensure_indexes
+from app.kiro.job_runner import get_owner_fields
+
+async def backfill():
+    await connect_to_mongo()
+    await ensure_indexes()
+    db = await get_database()
+    print("Connected. Backfilling misconception owners...")
+
+    # One update per assessment, covering every misconception that lacks an owner
+    assessment_ids = await db.misconceptions.distinct("assessment_id", {"professor_id": None})
+    for aid in assessment_ids:
+        owner = await get_owner_fields(db, str(aid))
+        if not owner["professor_id"]:
+            print(f"Skipping {aid}: exam not found")
+            continue
+        result = await db.misconceptions.update_many(
+            {"assessment_id": aid, "professor_id": None},
+            {"$set": owner}
+        )
+        print(f"Assessment {aid}: {result.modified_count} misconceptions updated")
+
+    print("Backfill complete!")
+    await close_mongo_connection()
+
+if __name__ == "__main__":
+    try:
+        if sys.platform == 'win32':
+             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(backfill())
+    except Exception as e:
+        print(e)
@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pymongo import UpdateOne
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.db.indexes import ensure_indexes
+
+async def backfill():
+    await connect_to_mongo()
+    await ensure_indexes()
+    db = await get_database()
+    print("Connected. Backfilling marks and submission summaries...")
+
+    async for exam in db.exams.find({}, {"questions.id": 1, "questions.marks": 1, "professor_id": 1}):
+        exam_id = str(exam["_id"])
+        professor_id = str(exam["professor_id"])
+        question_marks = {q["id"]: q.get("marks", 1) for q in exam.get("questions", [])}
+        total_marks = sum(question_marks.values())
+
+        # 1. Denormalize marks onto each response
+        response_updates = []
+        submissions = {}
+        cursor = db.student_responses.find(
+            {"assessment_id": exam_id},
+            {"student_id": 1, "question_id": 1, "is_correct": 1, "submitted_at": 1}
+        )
+        async for r in cursor:
+            max_marks = question_marks.get(r["question_id"], 0)
+            is_correct = r.get("is_correct", False)
+            marks_awarded = max_marks if is_correct else 0
+            response_updates.append(UpdateOne(
+                {"_id": r["_id"]},
+                {"$set": {"max_marks": max_marks, "marks_awarded": marks_awarded, "professor_id": professor_id}}
+            ))
+
+            # 2. Accumulate one summary per student
+            sub = submissions.setdefault(r["student_id"], {
+                "student_id": r["student_id"],
+                "assessment_id": exam_id,
+                "professor_id": professor_id,
+                "score": 0,
+                "total_marks": total_marks,
+                "correct_count": 0,
+                "response_count": 0,
+                "submitted_at": r.get("submitted_at"),
+            })
+            sub["score"] += marks_awarded
+            sub["correct_count"] += 1 if is_correct else 0
+            sub["response_count"] += 1
+            if r.get("submitted_at") and (sub["submitted_at"] is None or r["submitted_at"] > sub["submitted_at"]):
+                sub["submitted_at"] = r["submitted_at"]
+
+            if len(response_updates) >= 1000:
+                await db.student_responses.bulk_write(response_updates, ordered=False)
+                response_updates = []
+
+        if response_updates:
+            await db.student_responses.bulk_write(response_updates, ordered=False)
+
+        if submissions:
+            await db.submissions.bulk_write([
+                UpdateOne(
+                    {"student_id": sub["student_id"], "assessment_id": exam_id},
+                    {"$set": sub},
+                    upsert=True
+                )
+                for sub in submissions.values()
+            ], ordered=False)
+        print(f"Exam {exam_id}: {len(submissions)} submissions")
+
+    print("Backfill complete!")
+    await close_mongo_connection()
+
+if __name__ == "__main__":
+    try:
+        if sys.platform == 'win32':
+             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(backfill())
+    except Exception as e:
+        print(e)
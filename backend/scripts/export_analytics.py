@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.analytics.export import run_export, new_export_id, FORMATS
+
+# Usage: python scripts/export_analytics.py [--format parquet|arrow] [--institution ID] [--assessment ID]
+# Writes partitioned files under EXPORT_DIR/<export_id>/ (requires pyarrow).
+async def export(args):
+    await connect_to_mongo()
+    db = await get_database()
+
+    export_id = args.export_id or new_export_id()
+    counts = await run_export(db, export_id, args.format, institution_id=args.institution, assessment_id=args.assessment)
+    print(f"Export {export_id}: {counts}")
+
+    await close_mongo_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export responses, misconceptions and exam metadata to Parquet/Arrow")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet")
+    parser.add_argument("--institution", help="Only exams of professors in this institution")
+    parser.add_argument("--assessment", help="Only this exam")
+    parser.add_argument("--export-id", help="Output folder name (defaults to a UTC timestamp)")
+    try:
+        if sys.platform == 'win32':
+             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(export(parser.parse_args()))
+    except Exception as e:
+        print(e)
@@ -0,0 +1,31 @@
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.analytics.exam_stats import rebuild_exam_stats, rebuild_all_exam_stats
+
+# Usage: python scripts/rebuild_exam_stats.py [exam_id]
+async def rebuild(exam_id: str = None):
+    await connect_to_mongo()
+    db = await get_database()
+
+    if exam_id:
+        stats = await rebuild_exam_stats(db, exam_id)
+        print(f"Rebuilt exam_stats for {exam_id}: {stats.get('attempt_count', 0)} attempts")
+    else:
+        count = await rebuild_all_exam_stats(db)
+        print(f"Rebuilt exam_stats for {count} exams")
+
+    await close_mongo_connection()
+
+if __name__ == "__main__":
+    try:
+        if sys.platform == 'win32':
+             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(rebuild(sys.argv[1] if len(sys.argv) > 1 else None))
+    except Exception as e:
+        print(e)
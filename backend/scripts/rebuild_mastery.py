@@ -0,0 +1,32 @@
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.analytics.mastery import rebuild_class_mastery, rebuild_all_mastery
+
+# Usage: python scripts/rebuild_mastery.py [class_id]
+# Recomputes the student x topic mastery chunks from raw responses.
+async def rebuild(class_id: str = None):
+    await connect_to_mongo()
+    db = await get_database()
+
+    if class_id:
+        count = await rebuild_class_mastery(db, class_id)
+        print(f"Rebuilt mastery for class {class_id} from {count} submissions")
+    else:
+        count = await rebuild_all_mastery(db)
+        print(f"Rebuilt mastery for {count} classes")
+
+    await close_mongo_connection()
+
+if __name__ == "__main__":
+    try:
+        if sys.platform == 'win32':
+             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(rebuild(sys.argv[1] if len(sys.argv) > 1 else None))
+    except Exception as e:
+        print(e)
@@ -0,0 +1,28 @@
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.analytics.counters import reconcile_counters
+
+# Recomputes the dashboard counter shards from misconceptions and submissions.
+# The API also runs this every COUNTER_RECONCILE_INTERVAL_SECONDS.
+async def reconcile():
+    await connect_to_mongo()
+    db = await get_database()
+
+    scopes = await reconcile_counters(db)
+    print(f"Reconciled counters for {scopes} scopes")
+
+    await close_mongo_connection()
+
+if __name__ == "__main__":
+    try:
+        if sys.platform == 'win32':
+             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(reconcile())
+    except Exception as e:
+        print(e)
@@ -0,0 +1,29 @@
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.analytics.topics import retag_subject_exams
+
+async def retag():
+    await connect_to_mongo()
+    db = await get_database()
+    print("Connected. Tagging exam questions from subject syllabi...")
+
+    for subject_id in await db.exams.distinct("subject_id"):
+        count = await retag_subject_exams(db, subject_id)
+        print(f"Subject {subject_id}: {count} exams tagged")
+
+    print("Tagging complete!")
+    await close_mongo_connection()
+
+if __name__ == "__main__":
+    try:
+        if sys.platform == 'win32':
+             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(retag())
+    except Exception as e:
+        print(e)
@@ -0,0 +1,41 @@
+import asyncio
+from fastapi import BackgroundTasks, Depends, FastAPI
+from fastapi.testclient import TestClient
+from app.core.admission import AdmissionController
+from app.api.v1.endpoints import drafts, ingest
+
+def make_controller():
+    return AdmissionController("test", max_in_flight=1, max_queue=0, queue_timeout=1, retry_after=1)
+
+def test_slow_background_task_does_not_hold_slot():
+    admission = make_controller()
+    seen = {}
+    app = FastAPI()
+
+    async def slow_job():
+        seen["in_flight"] = admission.in_flight
+        await asyncio.sleep(0.05)
+
+    @app.post("/submit", dependencies=[Depends(admission, scope="function")])
+    async def submit(background_tasks: BackgroundTasks):
+        seen["in_handler"] = admission.in_flight
+        background_tasks.add_task(slow_job)
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        assert client.post("/submit").status_code == 200
+        assert client.post("/submit").status_code == 200
+
+    assert seen["in_handler"] == 1
+    assert seen["in_flight"] == 0
+    assert admission.rejected_queue_full == 0
+
+def test_ingest_routes_release_admission_before_background_tasks():
+    routes = [
+        (ingest.router, "/responses"),
+        (drafts.router, "/{exam_id}/submit"),
+    ]
+    for router, path in routes:
+        route = next(r for r in router.routes if r.path == path)
+        dep = next(d for d in route.dependant.dependencies if d.call is ingest.ingest_admission)
+        assert dep.scope == "function"
@@ -0,0 +1,71 @@
+import asyncio
+from app.db import draft_buffer as draft_buffer_module
+from app.db.draft_buffer import DraftBuffer
+
+class SlowCollection:
+    """Stands in for the drafts collection; bulk_write lands only after `release` is set."""
+
+    def __init__(self):
+        self.docs = {}
+        self.release = asyncio.Event()
+        self.writing = asyncio.Event()
+        self.log = []
+
+    async def bulk_write(self, ops, ordered=True):
+        self.writing.set()
+        await self.release.wait()
+        for op in ops:
+            doc = op._doc["$set"]
+            self.docs[doc["_id"]] = doc
+        self.log.append("upsert")
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+        self.log.append("delete")
+
+def use_collection(monkeypatch, collection):
+    async def get_database():
+        return {"response_drafts": collection}
+    monkeypatch.setattr(draft_buffer_module, "get_database", get_database)
+
+def test_get_during_flush_returns_in_flight_draft(monkeypatch):
+    collection = SlowCollection()
+    use_collection(monkeypatch, collection)
+
+    async def scenario():
+        buffer = DraftBuffer("response_drafts", flush_interval=60)
+        buffer.put("s@x.com", "exam1", {"q1": "A"})
+        flush = asyncio.create_task(buffer.flush())
+        await collection.writing.wait()
+
+        # Batch has left _dirty but is not in the collection yet
+        draft = await buffer.get("s@x.com", "exam1")
+        collection.release.set()
+        await flush
+        return draft
+
+    draft = asyncio.run(scenario())
+    assert draft is not None
+    assert draft["answers"] == {"q1": "A"}
+
+def test_discard_during_flush_deletes_after_upsert(monkeypatch):
+    collection = SlowCollection()
+    use_collection(monkeypatch, collection)
+
+    async def scenario():
+        buffer = DraftBuffer("response_drafts", flush_interval=60)
+        buffer.put("s@x.com", "exam1", {"q1": "A"})
+        flush = asyncio.create_task(buffer.flush())
+        await collection.writing.wait()
+
+        discard = asyncio.create_task(buffer.discard("s@x.com", "exam1"))
+        await asyncio.sleep(0)
+        collection.release.set()
+        await asyncio.gather(flush, discard)
+        return await buffer.get("s@x.com", "exam1")
+
+    assert asyncio.run(scenario()) is None
+    assert collection.log == ["upsert", "delete"]
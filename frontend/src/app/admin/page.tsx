@@ -14,8 +14,10 @@ import { UploadAssessmentDialog } from "@/components/UploadAssessmentDialog"
 import { useEffect, useState } from "react"
 import { fetchStats, fetchMisconceptions, fetchProfessorRequests, approveProfessorRequest, fetchInstitutes } from "@/lib/api"
 import { toast } from "sonner"
+import { useSession } from "next-auth/react"
 
 export default function AdminDashboard() {
+    const { data: session } = useSession()
     const [stats, setStats] = useState({ pending: 0, valid: 0, analyzed: 0 })
     const [pendingMisconceptions, setPendingMisconceptions] = useState<any[]>([])
     const [profRequests, setProfRequests] = useState<any[]>([])
@@ -23,9 +25,12 @@ export default function AdminDashboard() {
     const [loading, setLoading] = useState(true)
 
     useEffect(() => {
+        const token = (session?.user as any)?.accessToken
+        if (!token) return
+
         async function load() {
             try {
-                const s = await fetchStats()
+                const s = await fetchStats(token)
                 setStats({
                     pending: s.pending_misconceptions,
                     valid: s.valid_misconceptions,
@@ -52,7 +57,7 @@ export default function AdminDashboard() {
             }
         }
         load()
-    }, [])
+    }, [session])
 
     const handleApproveProf = async (id: string) => {
         try {
@@ -96,7 +96,7 @@ export default function EditExamPage({ params }: { params: Promise<{ id: string
 
         try {
             const [examData, subjectsData, classesData] = await Promise.all([
-                fetchExam(id),
+                fetchExam(id, token),
                 fetchSubjects(token),
                 fetchClasses(token)
             ])
@@ -642,7 +642,12 @@ export default function EditExamPage({ params }: { params: Promise<{ id: string
                                         <Input
                                             placeholder="e.g. Normalization (Used for AI Analysis)"
                                             value={q.topic_id}
-                                            onChange={e => updateQuestion(idx, 'topic_id', e.target.value)}
+                                            onChange={e => {
+                                                // A hand-typed tag is no longer the syllabus one
+                                                const newQ = [...questions]
+                                                newQ[idx] = { ...newQ[idx], topic_id: e.target.value, auto_tagged: false }
+                                                setQuestions(newQ)
+                                            }}
                                         />
                                     </div>
                                 </div>
@@ -35,7 +35,7 @@ export default function ExamResultsPage({ params }: { params: Promise<{ id: stri
         if (!token) return
         try {
             const [examData, studentsData] = await Promise.all([
-                fetchExam(id),
+                fetchExam(id, token),
                 fetchExamStudentsScores(id, token)
             ])
             setExam(examData)
@@ -210,7 +210,7 @@ export default function ExamsPage() {
                                     <Badge variant={exam.is_validated ? "default" : "secondary"}>
                                         {exam.is_validated ? "Published" : "Draft"}
                                     </Badge>
-                                    {exam.questions?.length === 0 && <AlertCircle className="h-4 w-4 text-amber-500" />}
+                                    {exam.question_count === 0 && <AlertCircle className="h-4 w-4 text-amber-500" />}
                                 </div>
                                 <CardTitle className="text-lg font-bold">
                                     <span className="truncate block" title={exam.title}>{exam.title}</span>
@@ -233,7 +233,7 @@ export default function ExamsPage() {
                                     <div className="pt-4 flex flex-col gap-2">
                                         <div className="flex justify-between items-center bg-slate-50 p-2 rounded">
                                             <div className="text-xs font-medium">
-                                                {exam.questions?.length || 0} Questions
+                                                {exam.question_count || 0} Questions
                                             </div>
                                             <div className={`text-xs font-medium ${exam.anti_cheat_config?.fullscreen ? 'text-green-600' : 'text-slate-500'}`}>
                                                 Anti-Cheat: {exam.anti_cheat_config?.fullscreen ? 'On' : 'Off'}
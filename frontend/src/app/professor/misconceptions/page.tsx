@@ -16,6 +16,8 @@ export default function MisconceptionsPage() {
     const { data: session } = useSession()
     const [groupedData, setGroupedData] = useState<any[]>([])
     const [loading, setLoading] = useState(true)
+    const [nextCursor, setNextCursor] = useState<string | null>(null)
+    const [loadingMore, setLoadingMore] = useState(false)
     const [error, setError] = useState<string | null>(null)
     const [statusFilter, setStatusFilter] = useState<string>("pending")
     const [searchQuery, setSearchQuery] = useState("")
@@ -27,8 +29,9 @@ export default function MisconceptionsPage() {
             setLoading(true)
             try {
                 const token = (session.user as any).accessToken
-                const data = await fetchGroupedMisconceptions(statusFilter, token)
-                setGroupedData(data)
+                const { groups, nextCursor } = await fetchGroupedMisconceptions(statusFilter, token)
+                setGroupedData(groups)
+                setNextCursor(nextCursor)
             } catch (e: any) {
                 console.error(e)
                 setError(e.message || "Failed to load data")
@@ -39,6 +42,22 @@ export default function MisconceptionsPage() {
         load()
     }, [session, statusFilter])
 
+    const loadMore = async () => {
+        if (!nextCursor || !session?.user) return
+        setLoadingMore(true)
+        try {
+            const token = (session.user as any).accessToken
+            const page = await fetchGroupedMisconceptions(statusFilter, token, nextCursor)
+            setGroupedData(prev => [...prev, ...page.groups])
+            setNextCursor(page.nextCursor)
+        } catch (e: any) {
+            console.error(e)
+            setError(e.message || "Failed to load data")
+        } finally {
+            setLoadingMore(false)
+        }
+    }
+
     // --- Analytics Derived Data ---
     const stats = useMemo(() => {
         let totalIssues = 0
@@ -340,6 +359,14 @@ export default function MisconceptionsPage() {
                     </AnimatePresence>
                 </div>
             )}
+
+            {!loading && nextCursor && (
+                <div className="flex justify-center">
+                    <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                        {loadingMore ? "Loading..." : "Load more exams"}
+                    </Button>
+                </div>
+            )}
         </div>
     )
 }
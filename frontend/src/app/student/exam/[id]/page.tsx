@@ -43,15 +43,16 @@ export default function TakeExamPage() {
 
     // Load Exam
     useEffect(() => {
-        if (!params.id) return
-        fetchExam(params.id as string)
+        const token = (session?.user as any)?.accessToken
+        if (!params.id || !token) return
+        fetchExam(params.id as string, token)
             .then(data => {
                 setExam(data)
                 setTimeLeft(data.duration_minutes * 60)
             })
             .catch(err => console.error(err))
             .finally(() => setLoading(false))
-    }, [params.id])
+    }, [params.id, session])
 
     // Timer Logic
     useEffect(() => {
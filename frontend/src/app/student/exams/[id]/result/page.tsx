@@ -31,7 +31,7 @@ export default function StudentExamResultPage() {
 
     const loadData = async (token: string) => {
         try {
-            const eData = await fetchExam(id)
+            const eData = await fetchExam(id, token)
             setExam(eData)
 
             const rData = await fetchMyResult(id, token)
@@ -1,7 +1,10 @@
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000/api/v1";
 
-export async function fetchStats() {
-    const res = await fetch(`${API_URL}/analytics/dashboard/stats`, { cache: 'no-store' });
+export async function fetchStats(token: string) {
+    const res = await fetch(`${API_URL}/analytics/dashboard/stats`, {
+        headers: { "Authorization": `Bearer ${token}` },
+        cache: 'no-store'
+    });
     if (!res.ok) throw new Error(`Failed to fetch stats: ${res.status} ${res.statusText}`);
     return res.json();
 }
@@ -12,13 +15,19 @@ export async function fetchMisconceptions(status: string = "pending") {
     return res.json();
 }
 
-export async function fetchGroupedMisconceptions(status: string = "valid", token: string) {
-    const res = await fetch(`${API_URL}/analytics/misconceptions/grouped?status=${status}`, {
+// Fields the grouped list view shows (skips evidence, reasoning, etc.)
+const GROUPED_LIST_FIELDS = "cluster_label,confidence_score,student_count,status"
+
+export async function fetchGroupedMisconceptions(status: string = "valid", token: string, cursor: string | null = null) {
+    // One page of exam groups; pass the returned nextCursor to load the next one
+    const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`${API_URL}/analytics/misconceptions/grouped?status=${status}&fields=${GROUPED_LIST_FIELDS}${query}`, {
         cache: 'no-store',
         headers: { "Authorization": `Bearer ${token}` }
     });
     if (!res.ok) throw new Error(`Failed to fetch grouped misconceptions: ${res.status} ${res.statusText}`);
-    return res.json();
+    const groups = await res.json();
+    return { groups, nextCursor: res.headers.get("X-Next-Cursor") };
 }
 
 export async function updateMisconceptionStatus(id: string, status: string, token: string) {
@@ -188,8 +197,11 @@ export async function createExam(examData: any, token: string) {
 }
 
 
-export async function fetchExam(id: string) {
-    const res = await fetch(`${API_URL}/exams/${id}`, { cache: 'no-store' });
+export async function fetchExam(id: string, token: string) {
+    const res = await fetch(`${API_URL}/exams/${id}`, {
+        headers: { "Authorization": `Bearer ${token}` },
+        cache: 'no-store'
+    });
     if (!res.ok) throw new Error("Failed to fetch exam");
     return res.json();
 }